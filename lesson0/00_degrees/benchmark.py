@@ -0,0 +1,222 @@
+"""
+Benchmarks degrees.py on synthetic datasets.
+
+    python benchmark.py --edges 10000 1000000 --queries 200 > results.json
+
+For every scale, generates people.csv, movies.csv and stars.csv with
+power-law cast sizes and actor popularity, then for every load mode
+times load_data and a fixed set of random queries with both BFS and
+bidirectional search. Each (scale, mode) run happens in a fresh process
+so peak memory is measured separately. Results are printed as JSON.
+"""
+
+import argparse
+import concurrent.futures
+import csv
+import json
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+MODES = ["dict", "compact", "snapshot", "streaming"]
+
+
+def generate(directory, edges, mean_cast=8, alpha=2.0, seed=0):
+    """
+    Writes a synthetic dataset with about `edges` star rows to `directory`.
+
+    Cast sizes follow a Pareto distribution with shape `alpha` scaled to
+    average `mean_cast`, and stars are drawn with Zipf-like popularity,
+    so a few people appear in many movies and most in a handful.
+    """
+    rng = random.Random(seed)
+    num_movies = max(1, edges // mean_cast)
+    num_people = max(2, edges // 3)
+    os.makedirs(directory, exist_ok=True)
+
+    with open(f"{directory}/people.csv", "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "name", "birth"])
+        for p in range(num_people):
+            writer.writerow([p, f"Person {p}", rng.randint(1900, 2005)])
+
+    with open(f"{directory}/movies.csv", "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "title", "year"])
+        for m in range(num_movies):
+            writer.writerow([m, f"Movie {m}", rng.randint(1920, 2024)])
+
+    # Cumulative Zipf weights, shuffled so popularity is not tied to id
+    popularity = list(range(num_people))
+    rng.shuffle(popularity)
+    total = 0.0
+    cumulative = []
+    for rank in range(1, num_people + 1):
+        total += 1 / rank
+        cumulative.append(total)
+
+    scale = mean_cast * (alpha - 1) / alpha
+    with open(f"{directory}/stars.csv", "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["person_id", "movie_id"])
+        for m in range(num_movies):
+            cast = min(num_people, max(1, int(scale * rng.paretovariate(alpha))))
+            for rank in rng.choices(range(num_people), cum_weights=cumulative,
+                                    k=cast):
+                writer.writerow([popularity[rank], m])
+
+
+def build_snapshot(directory):
+    """
+    Writes a snapshot of the dataset for the snapshot mode to open and
+    returns its path. Meant to run in its own process, so parsing the CSV
+    files does not count towards the measured run's memory.
+    """
+    import snapshot
+    from graph import CompactGraph
+
+    path = f"{directory}/{snapshot.SNAPSHOT}"
+    snapshot.write_snapshot(CompactGraph.from_csv(directory), path)
+    return path
+
+
+def run(directory, mode, num_queries, seed):
+    """
+    Loads the dataset in `mode` and times `num_queries` random queries.
+    Meant to run in its own process.
+    """
+    import degrees
+    from util import SearchStats
+
+    start = time.perf_counter()
+    degrees.load_data(directory, compact=mode == "compact",
+                      streaming=mode == "streaming")
+    result = {
+        "mode": mode,
+        "load_seconds": time.perf_counter() - start,
+        "load_rss_bytes": peak_rss(),
+    }
+
+    # Query people who starred in something, like real traffic would
+    if degrees.graph is not None:
+        person_ids = [degrees.graph.person_ids[p]
+                      for p in range(degrees.graph.num_people)]
+    else:
+        person_ids = list(degrees.people)
+    person_ids = [person_id for person_id in person_ids
+                  if degrees.movie_count(person_id) > 0]
+    rng = random.Random(seed)
+    pairs = [(rng.choice(person_ids), rng.choice(person_ids))
+             for _ in range(num_queries)]
+
+    for name, bidirectional in [("bfs", False), ("bidirectional", True)]:
+        latencies = []
+        explored = []
+        connected = 0
+        for source, target in pairs:
+            stats = SearchStats()
+            start = time.perf_counter()
+            path = degrees.shortest_path(source, target,
+                                         bidirectional=bidirectional,
+                                         stats=stats)
+            latencies.append(time.perf_counter() - start)
+            explored.append(stats.num_explored)
+            connected += path is not None
+        latencies.sort()
+        explored.sort()
+        result[name] = {
+            "queries": len(pairs),
+            "connected": connected,
+            "p50_seconds": percentile(latencies, 50),
+            "p99_seconds": percentile(latencies, 99),
+            "mean_explored": sum(explored) / max(1, len(explored)),
+            "p99_explored": percentile(explored, 99),
+        }
+
+    result["peak_rss_bytes"] = peak_rss()
+    return result
+
+
+def percentile(values, q):
+    """
+    Returns the nearest-rank q-th percentile of sorted `values`.
+    """
+    if not values:
+        return None
+    rank = max(1, -(-q * len(values) // 100))
+    return values[rank - 1]
+
+
+def peak_rss():
+    """
+    Returns the peak resident set size of this process in bytes.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def in_fresh_process(function, *args):
+    """
+    Returns function(*args) computed in a new process, so peak memory is
+    not shared with this process or other runs.
+    """
+    with concurrent.futures.ProcessPoolExecutor(
+            1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(function, *args).result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--edges", type=int, nargs="+", default=[10_000],
+                        help="star rows per generated dataset")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--mean-cast", type=int, default=8)
+    parser.add_argument("--alpha", type=float, default=2.0,
+                        help="Pareto shape of cast sizes")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir",
+                        help="where to generate datasets (default temporary)")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = args.workdir or tmp
+        for edges in args.edges:
+            directory = os.path.join(workdir, f"synthetic-{edges}")
+            start = time.perf_counter()
+            generate(directory, edges, args.mean_cast, args.alpha, args.seed)
+            print(f"Generated {directory} in "
+                  f"{time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+            for mode in args.modes:
+                path = None
+                if mode == "snapshot":
+                    path = in_fresh_process(build_snapshot, directory)
+                try:
+                    result = in_fresh_process(
+                        run, directory, mode, args.queries, args.seed)
+                finally:
+                    if path is not None:
+                        os.remove(path)
+                result["edges"] = edges
+                results.append(result)
+                print(f"{mode} on {edges} edges done", file=sys.stderr)
+
+    json.dump({"python": sys.version.split()[0], "results": results},
+              sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+from collections import OrderedDict
+
+# Returned by PathCache.get when a pair has not been cached, since None
+# is a valid cached answer (not connected)
+MISSING = object()
+
+
+class PathCache():
+    """
+    Bounded LRU cache of shortest paths, keyed on the unordered pair of
+    people so a query and its reverse share one entry.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        # Maps (person_id, person_id) in sorted order -> (source, path)
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, source, target):
+        """
+        Returns the cached path from source to target, reversing the
+        stored path if it was found the other way around, or MISSING.
+        """
+        key = pair_key(source, target)
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return MISSING
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+        stored_source, path = entry
+        if path is None:
+            return None
+        if stored_source == source:
+            return list(path)
+        return reverse_path(stored_source, path)
+
+    def put(self, source, target, path):
+        """
+        Caches the path from source to target, evicting the least
+        recently used pair if the cache is full.
+        """
+        key = pair_key(source, target)
+        self.entries[key] = (source, None if path is None else tuple(path))
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """
+        Drops every cached path, keeping the counters.
+        """
+        self.entries.clear()
+
+    def counters(self):
+        """
+        Returns the cache counters as a dict.
+        """
+        return {
+            "size": len(self.entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+def pair_key(source, target):
+    return (source, target) if source <= target else (target, source)
+
+
+def reverse_path(source, path):
+    """
+    Returns the (movie_id, person_id) pairs leading back from the end
+    of `path` to `source`.
+    """
+    people = [source] + [person_id for _, person_id in path]
+    return [(path[i][0], people[i]) for i in range(len(path) - 1, -1, -1)]
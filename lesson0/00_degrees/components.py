@@ -0,0 +1,73 @@
+from array import array
+
+
+class ComponentIndex():
+    """
+    Connected component of every person, where two people are connected
+    if a chain of shared movies links them.
+    """
+
+    def __init__(self, labels, sizes):
+        # Maps person (id or index) -> component label
+        self.labels = labels
+        # Number of people in each component, indexed by label
+        self.sizes = sizes
+
+    def connected(self, a, b):
+        """
+        Returns True if people `a` and `b` are in the same component.
+        """
+        return self.labels[a] == self.labels[b]
+
+    def size_of(self, person):
+        """
+        Returns the number of people in the component holding `person`.
+        """
+        return self.sizes[self.labels[person]]
+
+
+def label_components(num_people, casts):
+    """
+    Labels people 0 .. num_people - 1 by connected component with a
+    union-find pass, where `casts` yields the person indexes of each movie.
+
+    Returns (labels, sizes) arrays, with labels numbered from 0 in order
+    of each component's first person.
+    """
+    parent = array("i", range(num_people))
+    rank = array("b", bytes(num_people))
+
+    def find(x):
+        while parent[x] != x:
+            # Path halving keeps the trees shallow without recursion
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for cast in casts:
+        first = None
+        for person in cast:
+            if first is None:
+                first = find(person)
+                continue
+            root = find(person)
+            if root == first:
+                continue
+            if rank[root] > rank[first]:
+                root, first = first, root
+            parent[root] = first
+            if rank[root] == rank[first]:
+                rank[first] += 1
+
+    labels = array("i", bytes(4 * num_people))
+    root_labels = {}
+    sizes = array("i")
+    for person in range(num_people):
+        root = find(person)
+        label = root_labels.get(root)
+        if label is None:
+            label = root_labels[root] = len(sizes)
+            sizes.append(0)
+        labels[person] = label
+        sizes[label] += 1
+    return labels, sizes
@@ -1,7 +1,19 @@
+import argparse
 import csv
+import json
+import multiprocessing
+import os
 import sys
+from collections import Counter
 
-from util import Node, QueueFrontier
+from cache import MISSING, PathCache
+from components import ComponentIndex, label_components
+from fuzzy import FuzzyNameIndex
+from graph import CompactGraph
+from loader import stream_load
+from hub import HubIndex
+from snapshot import SNAPSHOT, open_snapshot
+from util import Node, QueueFrontier, SearchStats
 
 # Maps names to a set of corresponding person_ids
 names = {}
@@ -12,11 +24,63 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# CompactGraph holding the whole dataset when loaded with compact=True or
+# from a snapshot, in which case names, people and movies stay empty
+graph = None
 
-def load_data(directory):
+# ComponentIndex keyed by person_id, built by load_data for the
+# dictionaries (a CompactGraph carries its own)
+components = None
+
+# PathCache in front of shortest_path, if enabled with enable_path_cache
+path_cache = None
+
+# FuzzyNameIndex over every name, built by get_name_index on first use
+# so loads that never look up a misspelled name do not pay for it
+name_index = None
+
+# Maps hub person_ids to a HubIndex of every path from that person
+hubs = {}
+
+
+def load_data(directory, compact=False, streaming=False,
+              chunk_size=100_000, memory_limit=None):
     """
     Load data from CSV files into memory.
+
+    With `compact`, builds an integer-indexed CompactGraph instead of the
+    names/people/movies dictionaries. If the directory holds a snapshot
+    (see snapshot.py) newer than the CSV files, it is opened instead.
+
+    With `streaming`, fills the dictionaries `chunk_size` rows at a time,
+    keeping only people and movies that appear in stars.csv, and stops
+    with MemoryError past `memory_limit` bytes. Returns a LoadReport of
+    the rows dropped. A streaming load always reads the CSV files, even
+    if there is a snapshot.
     """
+    global graph, components, name_index
+    names.clear()
+    people.clear()
+    movies.clear()
+    hubs.clear()
+    name_index = None
+    if path_cache is not None:
+        path_cache.clear()
+    components = None
+    if not streaming and has_snapshot(directory):
+        graph = open_snapshot(f"{directory}/{SNAPSHOT}")
+        return
+    if compact:
+        graph = CompactGraph.from_csv(directory)
+        return
+    graph = None
+
+    if streaming:
+        report = stream_load(directory, people, movies, names,
+                             chunk_size, memory_limit)
+        components = index_components()
+        return report
+
     # Load people
     with open(f"{directory}/people.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)
@@ -51,25 +115,136 @@ def load_data(directory):
             except KeyError:
                 pass
 
+    components = index_components()
+
+
+def index_components():
+    """
+    Returns a ComponentIndex of the people dictionary, keyed by person_id.
+    """
+    person_ids = list(people)
+    position = {person_id: i for i, person_id in enumerate(person_ids)}
+    labels, sizes = label_components(len(person_ids), (
+        [position[person_id] for person_id in movie["stars"]]
+        for movie in movies.values()
+    ))
+    return ComponentIndex(
+        {person_id: labels[i] for i, person_id in enumerate(person_ids)},
+        sizes)
+
+
+def connected(source, target):
+    """
+    Returns True if a path between the two people exists, in O(1).
+    """
+    if graph is not None:
+        return graph.components.connected(
+            graph.person_index[source], graph.person_index[target])
+    return components.connected(source, target)
+
+
+def component_sizes():
+    """
+    Returns the size of every connected component, largest first.
+    """
+    index = graph.components if graph is not None else components
+    return sorted(index.sizes, reverse=True)
+
+
+def has_snapshot(directory):
+    """
+    Returns True if the directory holds an up to date snapshot.
+    """
+    return up_to_date(f"{directory}/{SNAPSHOT}", directory)
+
+
+def up_to_date(path, directory):
+    """
+    Returns True if the file at `path` exists and is no older than the
+    CSV files in `directory` it was built from. CSV files that are not
+    there cannot be newer, so a file shipped without them is current.
+    """
+    if not os.path.exists(path):
+        return False
+    built = os.path.getmtime(path)
+    for name in ["people", "movies", "stars"]:
+        source = f"{directory}/{name}.csv"
+        if os.path.exists(source) and os.path.getmtime(source) > built:
+            return False
+    return True
+
 
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    parser = argparse.ArgumentParser(
+        description="Find degrees of separation between two people.")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--compact", action="store_true",
+                        help="load into an integer-indexed CompactGraph")
+    parser.add_argument("--bidirectional", action="store_true",
+                        help="search from both people at once")
+    parser.add_argument("--batch", nargs="?", const="-", metavar="FILE",
+                        help="answer tab separated pairs from FILE "
+                             "(default stdin), one JSON result per line")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="processes answering batch queries")
+    parser.add_argument("--streaming", action="store_true",
+                        help="load in chunks, skipping people and movies "
+                             "not in stars.csv, and report dropped rows")
+    parser.add_argument("--chunk-size", type=int, default=100_000,
+                        metavar="ROWS", help="rows per chunk when streaming")
+    parser.add_argument("--memory-limit", type=int, metavar="MB",
+                        help="abort a streaming load past this much memory")
+    parser.add_argument("--rank", choices=["birth", "movies"],
+                        help="pick between people sharing a name by earliest "
+                             "birth or most movies instead of asking")
+    parser.add_argument("--fuzzy", action="store_true",
+                        help="fall back to the closest name on a typo")
+    parser.add_argument("--cache-size", type=int, default=0, metavar="N",
+                        help="cache the last N paths (batch mode)")
+    parser.add_argument("--components", action="store_true",
+                        help="print connected component sizes and exit")
+    parser.add_argument("--hub", action="append", default=[], metavar="NAME",
+                        help="precompute every path from this person, "
+                             "kept in DIRECTORY/hub-<id>.csv across runs")
+    args = parser.parse_args()
+
+    if args.components:
+        load(args, sys.stdout)
+        sizes = component_sizes()
+        print(f"{sum(sizes)} people in {len(sizes)} connected components.")
+        for size, count in sorted(Counter(sizes).items(), reverse=True):
+            print(f"{count} of size {size}")
+        return
+
+    if args.batch is not None:
+        print("Loading data...", file=sys.stderr)
+        load(args, sys.stderr)
+        add_hubs(args, sys.stderr)
+        enable_path_cache(args.cache_size)
+        print("Data loaded.", file=sys.stderr)
+        if args.batch == "-":
+            counters = serve(sys.stdin, sys.stdout, args)
+        else:
+            with open(args.batch, encoding="utf-8") as f:
+                counters = serve(f, sys.stdout, args)
+        if path_cache is not None:
+            print(json.dumps({"cache": counters}), file=sys.stderr)
+        return
 
     # Load data from files into memory
     print("Loading data...")
-    load_data(directory)
+    load(args, sys.stdout)
+    add_hubs(args, sys.stdout)
     print("Data loaded.")
 
-    source = person_id_for_name(input("Name: "))
+    source = person_id_for_name(input("Name: "), args.rank, args.fuzzy)
     if source is None:
         sys.exit("Person not found.")
-    target = person_id_for_name(input("Name: "))
+    target = person_id_for_name(input("Name: "), args.rank, args.fuzzy)
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    path = shortest_path(source, target, bidirectional=args.bidirectional)
 
     if path is None:
         print("Not connected.")
@@ -78,28 +253,275 @@ def main():
         print(f"{degrees} degrees of separation.")
         path = [(None, source)] + path
         for i in range(degrees):
-            person1 = people[path[i][1]]["name"]
-            person2 = people[path[i + 1][1]]["name"]
-            movie = movies[path[i + 1][0]]["title"]
+            person1 = person_name(path[i][1])
+            person2 = person_name(path[i + 1][1])
+            movie = movie_title(path[i + 1][0])
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
+def load(args, out):
+    """
+    Loads the dataset as the command line asks, reporting dropped rows
+    of a streaming load to `out`.
+    """
+    if not args.streaming:
+        load_data(args.directory, compact=args.compact)
+    else:
+        memory_limit = (args.memory_limit * 2 ** 20 if args.memory_limit
+                        else None)
+        try:
+            report = load_data(args.directory, streaming=True,
+                               chunk_size=args.chunk_size,
+                               memory_limit=memory_limit)
+        except MemoryError as e:
+            sys.exit(f"Could not load data: {e}")
+        print(report.summary(), file=out)
+
+    # Built up front so forked batch workers share it
+    if args.fuzzy:
+        get_name_index()
+
+
+def add_hubs(args, out):
+    """
+    Loads or builds the hub indexes named on the command line.
+    """
+    for name in args.hub:
+        try:
+            person_id = resolve_person(name)
+        except ValueError as e:
+            sys.exit(f"--hub: {e}")
+        add_hub(person_id, f"{args.directory}/hub-{person_id}.csv",
+                args.directory)
+        print(f"Indexed paths from {person_name(person_id)}.", file=out)
+
+
+def add_hub(person_id, filename=None, directory=None):
+    """
+    Registers a HubIndex for `person_id` so shortest_path to or from them
+    is a lookup. The index is read from `filename` if it exists, otherwise
+    built with one BFS and, if a filename is given, saved there.
+
+    If the data was loaded from `directory`, a file older than its CSV
+    files is stale and is rebuilt instead.
+    """
+    if filename is not None and (
+            up_to_date(filename, directory) if directory is not None
+            else os.path.exists(filename)):
+        hub = HubIndex.load(filename)
+    else:
+        hub = HubIndex.build(person_id, neighbors_for_person)
+        if filename is not None:
+            hub.save(filename)
+    hubs[person_id] = hub
+    return hub
+
+
+def serve(lines, out, args):
+    """
+    Answers one query per line of `lines`, each a source and target name
+    (or IMDb id) separated by a tab, writing one JSON object per line to
+    `out` in the same order.
+
+    With more than one worker, queries are answered by a process pool.
+    Forked workers share the already loaded data with this process.
+
+    Returns the path cache counters, summed over every worker's cache,
+    or None if the cache is disabled.
+    """
+    queries = (
+        (line, args.bidirectional, args.rank, args.fuzzy)
+        for line in lines if line.strip()
+    )
+    if args.workers <= 1:
+        for result in map(answer_query, queries):
+            out.write(result + "\n")
+        return None if path_cache is None else path_cache.counters()
+
+    if "fork" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("fork")
+        initializer, initargs = None, ()
+    else:
+        # Spawned workers start empty, so each loads the data itself
+        context = multiprocessing.get_context("spawn")
+        initializer = init_worker
+        initargs = (args,)
+
+    if path_cache is None:
+        with context.Pool(args.workers, initializer, initargs) as pool:
+            for result in pool.imap(answer_query, queries, chunksize=16):
+                out.write(result + "\n")
+        return None
+
+    # Each worker has a cache of its own, so add up what they report
+    counters = Counter()
+    with context.Pool(args.workers, initializer, initargs) as pool:
+        for result, changes in pool.imap(answer_query_counted, queries,
+                                         chunksize=16):
+            out.write(result + "\n")
+            counters.update(changes)
+    return {
+        "size": counters["size"],
+        "maxsize": path_cache.maxsize * args.workers,
+        "hits": counters["hits"],
+        "misses": counters["misses"],
+        "evictions": counters["evictions"],
+        "workers": args.workers,
+    }
+
+
+def init_worker(args):
+    """
+    Loads the data into a spawned pool worker as the command line asks,
+    so it holds the same people and hubs as the parent process.
+    """
+    with open(os.devnull, "w", encoding="utf-8") as out:
+        load(args, out)
+        add_hubs(args, out)
+    enable_path_cache(args.cache_size)
+
+
+def answer_query_counted(query):
+    """
+    Returns the JSON result line for a query, with how much it changed
+    this process's path cache counters.
+    """
+    before = path_cache.counters()
+    result = answer_query(query)
+    after = path_cache.counters()
+    return result, {
+        name: after[name] - before[name]
+        for name in ["size", "hits", "misses", "evictions"]
+    }
+
+
+def answer_query(query):
+    """
+    Returns the JSON result line for a single batch query.
+    """
+    line, bidirectional, rank, fuzzy = query
+    result = {}
+    fields = line.rstrip("\r\n").split("\t")
+    if len(fields) != 2:
+        result["error"] = "expected source<TAB>target"
+        return json.dumps(result)
+    try:
+        result["source"] = resolve_person(fields[0], rank, fuzzy)
+        result["target"] = resolve_person(fields[1], rank, fuzzy)
+    except ValueError as e:
+        result["error"] = str(e)
+        return json.dumps(result)
+
+    path = shortest_path(result["source"], result["target"],
+                         bidirectional=bidirectional)
+    if path is None:
+        result["degrees"] = None
+        result["path"] = None
+    else:
+        result["degrees"] = len(path)
+        result["path"] = [[movie_id, person_id] for movie_id, person_id in path]
+    return json.dumps(result)
+
+
+def resolve_person(text, rank=None, fuzzy=False):
+    """
+    Returns the IMDb id for an id or a name, without prompting.
+    Ambiguous names are settled by `rank` (see rank_candidates).
+
+    Raises ValueError if there is no such person, or the name is
+    ambiguous and no rank is given.
+    """
+    text = text.strip()
+    if is_person_id(text):
+        return text
+    person_ids = candidates_for_name(text, fuzzy)
+    if len(person_ids) == 0:
+        raise ValueError(f"person not found: {text}")
+    if len(person_ids) > 1:
+        if rank is None:
+            raise ValueError(f"ambiguous name: {text}")
+        return rank_candidates(person_ids, rank)[0]
+    return person_ids[0]
+
+
+def is_person_id(person_id):
+    """
+    Returns True if `person_id` is the IMDb id of a loaded person.
+    """
+    if graph is not None:
+        return person_id in graph.person_index
+    return person_id in people
+
+
 # returns [ (movie_id,person_id)]
-def shortest_path(source, target):
+def shortest_path(source, target, bidirectional=False, stats=None):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
     If no possible path, returns None.
+
+    With `bidirectional`, searches from both ends and meets in the middle.
+    If a SearchStats is given, the number of people explored is added to it.
+    """
+    if stats is None:
+        stats = SearchStats()
+
+    if not connected(source, target):
+        return None
+
+    hub = hubs.get(source) or hubs.get(target)
+    if hub is not None:
+        return hub.path(source, target)
+
+    if path_cache is not None:
+        path = path_cache.get(source, target)
+        if path is not MISSING:
+            return path
+
+    search = bidirectional_search if bidirectional else breadth_first_search
+
+    if graph is None:
+        path = search(source, target, stats, neighbors_for_person)
+    else:
+        # Search over the CSR arrays and only map back to IMDb ids at the end
+        path = search(graph.person_index[source], graph.person_index[target],
+                      stats, graph.neighbors)
+        if path is not None:
+            path = [(graph.movie_ids[m], graph.person_ids[p]) for m, p in path]
+
+    if path_cache is not None:
+        path_cache.put(source, target, path)
+    return path
+
+
+def enable_path_cache(maxsize):
     """
+    Puts an LRU cache of `maxsize` pairs in front of shortest_path,
+    or removes it if `maxsize` is 0. Returns the cache.
+    """
+    global path_cache
+    path_cache = PathCache(maxsize) if maxsize > 0 else None
+    return path_cache
+
 
+def breadth_first_search(source, target, stats, neighbors):
+    """
+    Returns the shortest list of (action, state) pairs that connect
+    the source to the target, where `neighbors(state)` yields the
+    (action, state) pairs reachable in one step.
+
+    If no possible path, returns None.
+    """
     # State ~ person_ids
     # Action ~ movie_ids
 
+    if source == target:
+        return []
+
     start = Node(state=source, parent=None, action=None)
     frontier = QueueFrontier() # BFS
     frontier.add(start)
 
-    num_explored = 0
     explored = set()
 
     while True:
@@ -107,44 +529,142 @@ def shortest_path(source, target):
             return None # cant find path
 
         node = frontier.remove()
-        num_explored+=1
+        explored.add(node.state)
+        stats.num_explored += 1
 
-        if node.state == target:
-            actions = []
+        for (neighbor_movie_id, neighbor) in neighbors(node.state):
+            if not frontier.contains_state(neighbor) and neighbor not in explored:
+                child = Node(state = neighbor, parent=node, action=neighbor_movie_id)
 
-            while node.parent is not None:
-                movie_id = node.action
-                person_id = node.state
+                # Goal test on generation saves expanding the whole last layer
+                if neighbor == target:
+                    return actions_to(child)
+                frontier.add(child)
 
-                actions.append((movie_id,person_id))
-                node = node.parent
 
-            actions.reverse()
-            return actions
+def actions_to(node):
+    """
+    Returns the (movie_id, person_id) pairs leading from the root to `node`.
+    """
+    actions = []
+    while node.parent is not None:
+        actions.append((node.action, node.state))
+        node = node.parent
+    actions.reverse()
+    return actions
 
-        explored.add(node.state)
-        num_explored += 1
 
-        for (neighbor_movie_id, neighbor) in neighbors_for_person(node.state):
-            if not frontier.contains_state(neighbor) and neighbor not in explored:
-                child = Node(state = neighbor, parent=node, action=neighbor_movie_id)
-                frontier.add(child)
+def bidirectional_search(source, target, stats=None, neighbors=None):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, expanding one BFS layer
+    at a time from whichever side has the smaller frontier.
 
+    If no possible path, returns None.
+    """
+    if stats is None:
+        stats = SearchStats()
+    if neighbors is None:
+        neighbors = neighbors_for_person
+    if source == target:
+        return []
+
+    # Maps person_id -> (movie_id, person_id one step closer to that side's root)
+    forward = {source: None}
+    backward = {target: None}
+    forward_layer = [source]
+    backward_layer = [target]
+
+    while forward_layer and backward_layer:
+        if len(forward_layer) <= len(backward_layer):
+            forward_layer, meeting = expand_layer(
+                forward_layer, forward, backward, stats, neighbors)
+        else:
+            backward_layer, meeting = expand_layer(
+                backward_layer, backward, forward, stats, neighbors)
+
+        if meeting is not None:
+            return join_paths(meeting, forward, backward)
+
+    return None
+
+
+def expand_layer(layer, parents, other_parents, stats, neighbors):
+    """
+    Expands every person in `layer` by one step, recording parents.
 
-def person_id_for_name(name):
+    Returns the next layer and the person where the two searches met,
+    choosing the meeting point that gives the shortest joined path.
+    """
+    next_layer = []
+    meeting = None
+    best = None
+    for person_id in layer:
+        stats.num_explored += 1
+        for (movie_id, neighbor) in neighbors(person_id):
+            if neighbor in parents:
+                continue
+            parents[neighbor] = (movie_id, person_id)
+            next_layer.append(neighbor)
+            if neighbor in other_parents:
+                length = path_length(neighbor, other_parents)
+                if best is None or length < best:
+                    best = length
+                    meeting = neighbor
+    return next_layer, meeting
+
+
+def path_length(person_id, parents):
+    """
+    Returns how many steps separate a person from the root of `parents`.
+    """
+    length = 0
+    while parents[person_id] is not None:
+        person_id = parents[person_id][1]
+        length += 1
+    return length
+
+
+def join_paths(meeting, forward, backward):
+    """
+    Joins the source-side and target-side parent chains at `meeting`
+    into a single list of (movie_id, person_id) pairs.
+    """
+    path = []
+    person_id = meeting
+    while forward[person_id] is not None:
+        movie_id, parent = forward[person_id]
+        path.append((movie_id, person_id))
+        person_id = parent
+    path.reverse()
+
+    person_id = meeting
+    while backward[person_id] is not None:
+        movie_id, parent = backward[person_id]
+        path.append((movie_id, parent))
+        person_id = parent
+    return path
+
+
+def person_id_for_name(name, rank=None, fuzzy=False):
     """
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
+
+    Ambiguities are settled by `rank` (see rank_candidates) if given,
+    otherwise by asking. With `fuzzy`, a name with no exact match falls
+    back to the most similar known name.
     """
-    person_ids = list(names.get(name.lower(), set()))
+    person_ids = candidates_for_name(name, fuzzy)
     if len(person_ids) == 0:
         return None
+    elif len(person_ids) > 1 and rank is not None:
+        return rank_candidates(person_ids, rank)[0]
     elif len(person_ids) > 1:
         print(f"Which '{name}'?")
         for person_id in person_ids:
-            person = people[person_id]
-            name = person["name"]
-            birth = person["birth"]
+            name = person_name(person_id)
+            birth = person_birth(person_id)
             print(f"ID: {person_id}, Name: {name}, Birth: {birth}")
         try:
             person_id = input("Intended Person ID: ")
@@ -157,11 +677,122 @@ def person_id_for_name(name):
         return person_ids[0]
 
 
+def candidates_for_name(name, fuzzy=False):
+    """
+    Returns the IMDB ids of everyone with the given name or, with `fuzzy`
+    and no exact match, with the most similar name.
+    """
+    person_ids = person_ids_for_name(name)
+    if not person_ids and fuzzy:
+        matches = get_name_index().search(name, limit=1)
+        if matches:
+            person_ids = person_ids_for_name(matches[0][0])
+    return person_ids
+
+
+def rank_candidates(person_ids, rank):
+    """
+    Orders people sharing a name, best first: by earliest birth year
+    for rank "birth", or by most movies for rank "movies". People with
+    no birth year go last.
+    """
+    if rank == "birth":
+        def key(person_id):
+            birth = person_birth(person_id)
+            return (0, int(birth)) if birth.isdigit() else (1, 0)
+    elif rank == "movies":
+        def key(person_id):
+            return -movie_count(person_id)
+    else:
+        raise ValueError(f"unknown rank: {rank}")
+    return sorted(person_ids, key=key)
+
+
+def suggest_names(text, limit=10):
+    """
+    Returns up to `limit` known names completing or resembling `text`,
+    prefix matches first.
+    """
+    index = get_name_index()
+    suggestions = index.prefix(text, limit)
+    for name, _ in index.search(text, limit):
+        if len(suggestions) == limit:
+            break
+        if name not in suggestions:
+            suggestions.append(name)
+    return suggestions
+
+
+def get_name_index():
+    """
+    Returns the FuzzyNameIndex, building it on first use.
+    """
+    global name_index
+    if name_index is None:
+        if graph is not None:
+            name_index = FuzzyNameIndex(graph.person_names)
+        else:
+            name_index = FuzzyNameIndex(
+                person["name"] for person in people.values())
+    return name_index
+
+
+def person_ids_for_name(name):
+    """
+    Returns the IMDB ids of everyone with the given name, ignoring case.
+    """
+    if graph is not None:
+        return [graph.person_ids[p] for p in graph.people_named(name)]
+    return list(names.get(name.lower(), set()))
+
+
+def person_name(person_id):
+    """
+    Returns the name of a person.
+    """
+    if graph is not None:
+        return graph.person_names[graph.person_index[person_id]]
+    return people[person_id]["name"]
+
+
+def person_birth(person_id):
+    """
+    Returns the birth year of a person.
+    """
+    if graph is not None:
+        return graph.person_births[graph.person_index[person_id]]
+    return people[person_id]["birth"]
+
+
+def movie_count(person_id):
+    """
+    Returns the number of movies a person starred in.
+    """
+    if graph is not None:
+        return len(graph.movies_for(graph.person_index[person_id]))
+    return len(people[person_id]["movies"])
+
+
+def movie_title(movie_id):
+    """
+    Returns the title of a movie.
+    """
+    if graph is not None:
+        return graph.movie_titles[graph.movie_index[movie_id]]
+    return movies[movie_id]["title"]
+
+
 def neighbors_for_person(person_id):
     """
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
+    if graph is not None:
+        return {
+            (graph.movie_ids[m], graph.person_ids[p])
+            for m, p in graph.neighbors(graph.person_index[person_id])
+        }
+
     movie_ids = people[person_id]["movies"]
     neighbors = set()
     for movie_id in movie_ids:
@@ -0,0 +1,265 @@
+import argparse
+import io
+import itertools
+import os
+import random
+import shutil
+
+import pytest
+
+import degrees
+import loader
+import snapshot
+from fuzzy import FuzzyNameIndex, trigrams
+from util import SearchStats
+
+SMALL = os.path.join(os.path.dirname(__file__), "small")
+
+
+@pytest.fixture(scope="module", autouse=True)
+def small_data():
+    degrees.load_data(SMALL)
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    """
+    Copies the small dataset's CSV files into tmp_path.
+    """
+    for name in ["people", "movies", "stars"]:
+        shutil.copy(os.path.join(SMALL, f"{name}.csv"), tmp_path)
+    return tmp_path
+
+
+def check_path(source, target, path):
+    person_id = source
+    for movie_id, next_person_id in path:
+        assert person_id in degrees.movies[movie_id]["stars"]
+        assert next_person_id in degrees.movies[movie_id]["stars"]
+        person_id = next_person_id
+    assert person_id == target
+
+
+pairs = list(itertools.product(["102", "129", "158", "1697"], repeat=2))
+
+
+@pytest.mark.parametrize("source,target", pairs)
+def test_bidirectional_matches_bfs(source, target):
+    path = degrees.shortest_path(source, target)
+    other = degrees.shortest_path(source, target, bidirectional=True)
+    assert (path is None) == (other is None)
+    if path is not None:
+        assert len(path) == len(other)
+        check_path(source, target, other)
+
+
+def test_stats_counts_each_person_once():
+    stats = SearchStats()
+    degrees.shortest_path("129", "102", stats=stats)
+    assert stats.num_explored == 1
+
+
+@pytest.mark.parametrize("bidirectional", [False, True])
+def test_compact_graph_matches_dicts(bidirectional):
+    expected = {
+        pair: degrees.shortest_path(*pair, bidirectional=bidirectional)
+        for pair in pairs
+    }
+    degrees.load_data(SMALL, compact=True)
+    try:
+        for pair, path in expected.items():
+            other = degrees.shortest_path(*pair, bidirectional=bidirectional)
+            assert (path is None) == (other is None)
+            if path is not None:
+                assert len(path) == len(other)
+    finally:
+        degrees.load_data(SMALL)
+
+
+def test_snapshot_round_trip(dataset):
+    expected = degrees.shortest_path("129", "1697")
+    degrees.load_data(str(dataset), compact=True)
+    snapshot.write_snapshot(degrees.graph, dataset / snapshot.SNAPSHOT)
+
+    degrees.load_data(str(dataset))
+    try:
+        assert isinstance(degrees.graph, snapshot.SnapshotGraph)
+        assert degrees.person_ids_for_name("TOM HANKS") == ["158"]
+        assert degrees.movie_title("93779") == "The Princess Bride"
+        assert len(degrees.shortest_path("129", "1697")) == len(expected)
+    finally:
+        degrees.load_data(SMALL)
+
+
+def test_snapshot_without_csv_files(dataset):
+    degrees.load_data(str(dataset), compact=True)
+    snapshot.write_snapshot(degrees.graph, dataset / snapshot.SNAPSHOT)
+    degrees.add_hub("102", dataset / "hub-102.csv")
+    for name in ["people", "movies", "stars"]:
+        os.remove(dataset / f"{name}.csv")
+    # However old, the hub file cannot be older than missing CSV files
+    os.utime(dataset / "hub-102.csv", (1, 1))
+
+    degrees.load_data(str(dataset))
+    try:
+        assert isinstance(degrees.graph, snapshot.SnapshotGraph)
+        hub = degrees.add_hub("102", dataset / "hub-102.csv", str(dataset))
+        assert os.path.getmtime(dataset / "hub-102.csv") == 1
+        assert len(hub.distances) == 15
+        assert len(degrees.shortest_path("129", "1697")) == 4
+    finally:
+        degrees.hubs.clear()
+        degrees.load_data(SMALL)
+
+
+def test_hub_index_matches_bfs(tmp_path):
+    expected = {pair: degrees.shortest_path(*pair) for pair in pairs}
+    filename = tmp_path / "hub-102.csv"
+    degrees.add_hub("102", filename)
+    degrees.hubs.clear()
+    degrees.add_hub("102", filename)
+    try:
+        for (source, target), path in expected.items():
+            if "102" not in (source, target):
+                continue
+            other = degrees.shortest_path(source, target)
+            assert (path is None) == (other is None)
+            if path is not None:
+                assert len(path) == len(other)
+                check_path(source, target, other)
+    finally:
+        degrees.hubs.clear()
+
+
+def test_stale_hub_file_is_rebuilt(dataset):
+    filename = dataset / "hub-102.csv"
+    with open(filename, "w", encoding="utf-8") as f:
+        f.write("person_id,distance,movie_id,parent_id\n102,0,,\n")
+    # Written before the CSV files changed
+    os.utime(filename, (0, 0))
+    try:
+        hub = degrees.add_hub("102", filename, str(dataset))
+        assert hub.distances == degrees.add_hub("102").distances
+        assert len(hub.distances) > 1
+        assert degrees.HubIndex.load(filename).distances == hub.distances
+    finally:
+        degrees.hubs.clear()
+
+
+def test_unreachable_pair_is_rejected_without_search():
+    stats = SearchStats()
+    assert degrees.shortest_path("102", "914612", stats=stats) is None
+    assert stats.num_explored == 0
+    assert degrees.component_sizes() == [15, 1]
+
+
+def test_path_cache_serves_reversed_pairs():
+    cache = degrees.enable_path_cache(2)
+    try:
+        forward = degrees.shortest_path("129", "1697")
+        backward = degrees.shortest_path("1697", "129")
+        check_path("1697", "129", backward)
+        assert len(backward) == len(forward)
+        degrees.shortest_path("102", "158")
+        degrees.shortest_path("102", "705")
+        assert cache.counters() == {
+            "size": 2, "maxsize": 2, "hits": 1, "misses": 3, "evictions": 1,
+        }
+    finally:
+        degrees.enable_path_cache(0)
+
+
+def test_cache_counters_add_up_across_workers():
+    args = argparse.Namespace(
+        directory=SMALL, compact=False, bidirectional=False, rank=None,
+        fuzzy=False, workers=2, cache_size=4)
+    lines = ["102\t158\n", "158\t102\n", "129\t1697\n"] * 20
+    out = io.StringIO()
+    degrees.enable_path_cache(args.cache_size)
+    try:
+        counters = degrees.serve(lines, out, args)
+    finally:
+        degrees.enable_path_cache(0)
+    assert len(out.getvalue().splitlines()) == len(lines)
+    assert counters["hits"] + counters["misses"] == len(lines)
+    assert counters["workers"] == 2 and counters["maxsize"] == 8
+
+
+def test_spawned_worker_loads_like_the_parent(dataset):
+    args = argparse.Namespace(
+        directory=str(dataset), compact=False, streaming=True, chunk_size=4,
+        memory_limit=64, fuzzy=False, hub=["Kevin Bacon"], cache_size=4)
+    try:
+        degrees.init_worker(args)
+        assert "914612" not in degrees.people
+        assert list(degrees.hubs) == ["102"]
+        assert degrees.path_cache.maxsize == 4
+    finally:
+        degrees.enable_path_cache(0)
+        degrees.load_data(SMALL)
+
+
+def test_name_lookup_without_prompting():
+    # Built on first use rather than by load_data
+    assert degrees.name_index is None
+    assert degrees.suggest_names("tom") == ["Tom Cruise", "Tom Hanks"]
+    assert degrees.person_id_for_name("Kevn Bacon") is None
+    assert degrees.person_id_for_name("Kevn Bacon", fuzzy=True) == "102"
+    assert degrees.rank_candidates(["102", "158", "1697"], "birth") == [
+        "1697", "158", "102"]
+    assert degrees.resolve_person("Tom Hnks", fuzzy=True) == "158"
+
+
+def test_fuzzy_search_matches_brute_force():
+    rng = random.Random(0)
+    syllables = ["an", "jo", "son", "ma", "ri", "el", "ker", "li", "o"]
+    names = {" ".join("".join(rng.choices(syllables, k=rng.randint(1, 3)))
+                      for _ in range(2)) for _ in range(2000)}
+    index = FuzzyNameIndex(names)
+    for query in rng.sample(sorted(names), 50):
+        query = query[:2] + query[3:]
+        grams = trigrams(query)
+        expected = sorted(
+            ((len(grams & trigrams(name)) / len(grams | trigrams(name)), name)
+             for name in names),
+            key=lambda entry: (-entry[0], entry[1]))
+        expected = [(name, similarity) for similarity, name in expected
+                    if similarity >= 0.3][:5]
+        assert index.search(query, limit=5) == expected
+
+
+def test_streaming_load_reports_dropped_rows(dataset):
+    with open(os.path.join(SMALL, "stars.csv"), encoding="utf-8") as f:
+        stars = f.read()
+    with open(dataset / "stars.csv", "w", encoding="utf-8") as f:
+        f.write(stars + "102,104257\n999,104257\n")
+
+    people, movies, names = {}, {}, {}
+    report = loader.stream_load(str(dataset), people, movies, names,
+                                chunk_size=4)
+    assert "914612" not in people
+    assert people["102"]["movies"] == degrees.people["102"]["movies"]
+    assert report.dropped == {
+        "person not in stars.csv": 1,
+        "duplicate star": 1,
+        "star with unknown person": 1,
+    }
+
+
+def test_streaming_load_ignores_snapshot(dataset):
+    degrees.load_data(str(dataset), compact=True)
+    snapshot.write_snapshot(degrees.graph, dataset / snapshot.SNAPSHOT)
+    args = argparse.Namespace(
+        directory=str(dataset), streaming=True, compact=False,
+        chunk_size=4, memory_limit=None, fuzzy=False)
+    out = io.StringIO()
+    try:
+        degrees.load(args, out)
+        assert degrees.graph is None
+        assert "stars.csv: read" in out.getvalue()
+        assert degrees.people["102"]["name"] == "Kevin Bacon"
+        # Dropped, not left over from the module's earlier load
+        assert "914612" not in degrees.people
+        assert degrees.component_sizes() == [15]
+    finally:
+        degrees.load_data(SMALL)
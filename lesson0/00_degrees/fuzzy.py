@@ -0,0 +1,141 @@
+import math
+from bisect import bisect_left
+
+# Slack for comparing similarity bounds computed in floating point
+EPSILON = 1e-9
+
+# Higher thresholds tried first by search, which prune far more names
+STEPS = [0.7, 0.5]
+
+
+class FuzzyNameIndex():
+    """
+    Prefix and typo-tolerant lookup over a set of names.
+
+    Names are matched case-insensitively. Prefix queries use binary search
+    over the sorted names; fuzzy queries rank names by how many character
+    trigrams they share with the query.
+    """
+
+    def __init__(self, names):
+        # Lowercased names in sorted order, and how each was first spelled
+        display = {}
+        for name in names:
+            display.setdefault(name.lower(), name)
+        self.keys = sorted(display)
+        self.display = [display[key] for key in self.keys]
+
+        # Maps trigram -> positions in self.keys of names containing it
+        self.trigrams = {}
+        self.sizes = []
+        for i, key in enumerate(self.keys):
+            grams = trigrams(key)
+            self.sizes.append(len(grams))
+            for gram in grams:
+                self.trigrams.setdefault(gram, []).append(i)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def prefix(self, text, limit=10):
+        """
+        Returns up to `limit` names starting with `text`, in sorted order.
+        """
+        text = text.lower()
+        i = bisect_left(self.keys, text)
+        matches = []
+        while i < len(self.keys) and len(matches) < limit:
+            if not self.keys[i].startswith(text):
+                break
+            matches.append(self.display[i])
+            i += 1
+        return matches
+
+    def search(self, text, limit=10, threshold=0.3):
+        """
+        Returns up to `limit` (name, similarity) pairs for the names most
+        similar to `text`, best first, where similarity is the Jaccard
+        index of their trigram sets.
+        """
+        grams = trigrams(text.lower())
+        # Names at least this similar rank above all others, so once
+        # enough are found the lower thresholds need not be searched
+        for bar in [step for step in STEPS if step > threshold] + [threshold]:
+            scored = self.scored(grams, bar)
+            if len(scored) >= limit:
+                break
+        scored.sort(key=lambda entry: (-entry[0], entry[1]))
+        return [(self.display[i], similarity)
+                for similarity, _, i in scored[:limit]]
+
+    def scored(self, grams, threshold):
+        """
+        Returns (similarity, key, position) for every name whose
+        similarity to the trigram set `grams` reaches the threshold.
+        """
+        size = len(grams)
+        # A name can only reach the threshold sharing at least `least`
+        # trigrams, and having between threshold * size and
+        # size / threshold of its own
+        least = max(1, math.ceil(threshold * size - EPSILON))
+        smallest = threshold * size - EPSILON
+        largest = size / threshold + EPSILON if threshold > 0 else math.inf
+
+        # levels[c] holds the names sharing c of the trigrams seen so far,
+        # rarest first. A name reaching `least` must have one of the
+        # size - least + 1 rarest trigrams, so names only join while those
+        # are counted, and are dropped once the trigrams left cannot lift
+        # them to `least`.
+        postings = sorted((self.trigrams.get(gram, []) for gram in grams),
+                          key=len)
+        levels = {}
+        for k, posting in enumerate(postings):
+            joining = k <= size - least
+            if joining:
+                remaining = set(posting)
+            else:
+                # Only names already counted matter, so look them up in
+                # the sorted posting list instead of hashing all of it
+                candidates = set().union(*levels.values())
+                if len(candidates) * 16 < len(posting):
+                    remaining = {i for i in candidates
+                                 if contains(posting, i)}
+                else:
+                    remaining = candidates.intersection(posting)
+            for count in sorted(levels, reverse=True):
+                hits = levels[count] & remaining
+                if hits:
+                    levels[count] -= hits
+                    levels.setdefault(count + 1, set()).update(hits)
+                    remaining -= hits
+            if joining and remaining:
+                levels.setdefault(1, set()).update(remaining)
+            left = size - k - 1
+            levels = {count: names for count, names in levels.items()
+                      if names and count + left >= least}
+
+        scored = []
+        for count, names in levels.items():
+            for i in names:
+                if not smallest <= self.sizes[i] <= largest:
+                    continue
+                similarity = count / (size + self.sizes[i] - count)
+                if similarity >= threshold:
+                    scored.append((similarity, self.keys[i], i))
+        return scored
+
+
+def contains(posting, i):
+    """
+    Returns True if the sorted list `posting` holds i.
+    """
+    j = bisect_left(posting, i)
+    return j < len(posting) and posting[j] == i
+
+def trigrams(text):
+    """
+    Returns the set of 3 character substrings of `text`, padded so the
+    start and end of the string count as well.
+    """
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
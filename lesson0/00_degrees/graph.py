@@ -0,0 +1,167 @@
+import csv
+from array import array
+
+from components import ComponentIndex, label_components
+
+
+class CompactGraph():
+    """
+    People and movies renumbered to dense integers, with the star
+    relation stored as two CSR adjacency arrays:
+
+        person_movies[person_offsets[p]:person_offsets[p + 1]]
+            movie indexes person p starred in
+        movie_stars[movie_offsets[m]:movie_offsets[m + 1]]
+            person indexes that starred in movie m
+    """
+
+    def __init__(self, person_ids, person_names, person_births,
+                 movie_ids, movie_titles, movie_years,
+                 person_offsets, person_movies, movie_offsets, movie_stars,
+                 person_index=None, movie_index=None, names=None,
+                 components=None):
+        self.person_ids = person_ids
+        self.person_names = person_names
+        self.person_births = person_births
+        self.movie_ids = movie_ids
+        self.movie_titles = movie_titles
+        self.movie_years = movie_years
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_stars = movie_stars
+        # Lookups from IMDb ids and lowercased names to indexes are built
+        # here unless the caller already has them (see snapshot.py)
+        if person_index is None:
+            person_index = {
+                person_id: i for i, person_id in enumerate(person_ids)
+            }
+        if movie_index is None:
+            movie_index = {
+                movie_id: i for i, movie_id in enumerate(movie_ids)
+            }
+        if names is None:
+            names = {}
+            for i, name in enumerate(person_names):
+                names.setdefault(name.lower(), []).append(i)
+        self.person_index = person_index
+        self.movie_index = movie_index
+        self.names = names
+
+        # ComponentIndex keyed by person index
+        if components is None:
+            components = ComponentIndex(*label_components(
+                self.num_people,
+                (self.stars_for(m) for m in range(self.num_movies))))
+        self.components = components
+
+    @classmethod
+    def from_csv(cls, directory):
+        """
+        Builds a compact graph from people.csv, movies.csv and stars.csv.
+        """
+        person_ids, person_names, person_births = [], [], []
+        person_index = {}
+        with open(f"{directory}/people.csv", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                person_index[row["id"]] = len(person_ids)
+                person_ids.append(row["id"])
+                person_names.append(row["name"])
+                person_births.append(row["birth"])
+
+        movie_ids, movie_titles, movie_years = [], [], []
+        movie_index = {}
+        with open(f"{directory}/movies.csv", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                movie_index[row["id"]] = len(movie_ids)
+                movie_ids.append(row["id"])
+                movie_titles.append(row["title"])
+                movie_years.append(row["year"])
+
+        # Star rows that reference an unknown person or movie are skipped,
+        # like load_data does
+        edge_people = array("i")
+        edge_movies = array("i")
+        with open(f"{directory}/stars.csv", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                p = person_index.get(row["person_id"])
+                m = movie_index.get(row["movie_id"])
+                if p is not None and m is not None:
+                    edge_people.append(p)
+                    edge_movies.append(m)
+
+        person_offsets, person_movies = build_csr(
+            len(person_ids), edge_people, edge_movies)
+        movie_offsets, movie_stars = build_csr(
+            len(movie_ids), edge_movies, edge_people)
+
+        return cls(person_ids, person_names, person_births,
+                   movie_ids, movie_titles, movie_years,
+                   person_offsets, person_movies, movie_offsets, movie_stars)
+
+    @property
+    def num_people(self):
+        return len(self.person_offsets) - 1
+
+    @property
+    def num_movies(self):
+        return len(self.movie_offsets) - 1
+
+    def movies_for(self, p):
+        """
+        Returns the movie indexes person `p` starred in.
+        """
+        return self.person_movies[self.person_offsets[p]:self.person_offsets[p + 1]]
+
+    def stars_for(self, m):
+        """
+        Returns the person indexes that starred in movie `m`.
+        """
+        return self.movie_stars[self.movie_offsets[m]:self.movie_offsets[m + 1]]
+
+    def neighbors(self, p):
+        """
+        Yields (movie, person) index pairs for people
+        who starred with person `p`.
+        """
+        person_offsets = self.person_offsets
+        person_movies = self.person_movies
+        movie_offsets = self.movie_offsets
+        movie_stars = self.movie_stars
+        for i in range(person_offsets[p], person_offsets[p + 1]):
+            m = person_movies[i]
+            for j in range(movie_offsets[m], movie_offsets[m + 1]):
+                yield m, movie_stars[j]
+
+    def people_named(self, name):
+        """
+        Returns the person indexes whose name matches `name`, ignoring case.
+        """
+        return list(self.names.get(name.lower(), []))
+
+
+def build_csr(size, sources, targets):
+    """
+    Groups `targets` by `sources` into CSR (offsets, values) arrays
+    of `size` rows, dropping duplicate (source, target) pairs.
+    """
+    counts = array("i", bytes(4 * (size + 1)))
+    for s in sources:
+        counts[s + 1] += 1
+    for i in range(size):
+        counts[i + 1] += counts[i]
+
+    values = array("i", bytes(4 * len(sources)))
+    cursor = array("i", counts)
+    for s, t in zip(sources, targets):
+        values[cursor[s]] = t
+        cursor[s] += 1
+
+    # Sort every row and squeeze out repeats of the same edge
+    offsets = array("i", [0])
+    unique = array("i")
+    for i in range(size):
+        row = sorted(set(values[counts[i]:counts[i + 1]]))
+        unique.extend(row)
+        offsets.append(len(unique))
+    return offsets, unique
@@ -0,0 +1,107 @@
+import csv
+from collections import deque
+
+
+class HubIndex():
+    """
+    Distances and BFS parent pointers from one hub person to everyone
+    reachable from them, so paths to or from the hub are lookups.
+    """
+
+    def __init__(self, hub, parents, distances):
+        self.hub = hub
+        # Maps person_id -> (movie_id, person_id one step closer to the hub)
+        self.parents = parents
+        # Maps person_id -> degrees of separation from the hub
+        self.distances = distances
+
+    @classmethod
+    def build(cls, hub, neighbors):
+        """
+        Runs a single BFS from `hub`, where `neighbors(person_id)` yields
+        (movie_id, person_id) pairs.
+        """
+        parents = {hub: None}
+        distances = {hub: 0}
+        queue = deque([hub])
+        while queue:
+            person_id = queue.popleft()
+            distance = distances[person_id] + 1
+            for movie_id, neighbor in neighbors(person_id):
+                if neighbor not in distances:
+                    parents[neighbor] = (movie_id, person_id)
+                    distances[neighbor] = distance
+                    queue.append(neighbor)
+        return cls(hub, parents, distances)
+
+    @classmethod
+    def load(cls, filename):
+        """
+        Reads an index written by save.
+        """
+        hub = None
+        parents = {}
+        distances = {}
+        with open(filename, encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                person_id = row["person_id"]
+                distances[person_id] = int(row["distance"])
+                if distances[person_id] == 0:
+                    hub = person_id
+                    parents[person_id] = None
+                else:
+                    parents[person_id] = (row["movie_id"], row["parent_id"])
+        if hub is None:
+            raise ValueError(f"{filename} has no hub row")
+        return cls(hub, parents, distances)
+
+    def save(self, filename):
+        """
+        Writes the index as CSV, one row per reachable person.
+        """
+        with open(filename, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["person_id", "distance", "movie_id", "parent_id"])
+            for person_id, distance in self.distances.items():
+                movie_id, parent_id = self.parents[person_id] or ("", "")
+                writer.writerow([person_id, distance, movie_id, parent_id])
+
+    def path(self, source, target):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs between
+        the hub and another person, in either direction.
+
+        If no possible path, returns None.
+        """
+        if source == self.hub:
+            return self.path_from_hub(target)
+        return self.path_to_hub(source)
+
+    def path_from_hub(self, person_id):
+        """
+        Returns the (movie_id, person_id) pairs leading from the hub
+        to `person_id`, or None if they are not connected.
+        """
+        if person_id not in self.parents:
+            return None
+        path = []
+        while self.parents[person_id] is not None:
+            movie_id, parent_id = self.parents[person_id]
+            path.append((movie_id, person_id))
+            person_id = parent_id
+        path.reverse()
+        return path
+
+    def path_to_hub(self, person_id):
+        """
+        Returns the (movie_id, person_id) pairs leading from `person_id`
+        to the hub, or None if they are not connected.
+        """
+        if person_id not in self.parents:
+            return None
+        path = []
+        while self.parents[person_id] is not None:
+            movie_id, parent_id = self.parents[person_id]
+            path.append((movie_id, parent_id))
+            person_id = parent_id
+        return path
@@ -0,0 +1,127 @@
+import csv
+import itertools
+import sys
+from collections import Counter
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows, where the memory ceiling is not enforced
+    resource = None
+
+
+class LoadReport():
+    """
+    What a streaming load kept and dropped, per file and per reason.
+    """
+
+    def __init__(self):
+        self.read = Counter()
+        self.kept = Counter()
+        self.dropped = Counter()
+        self.peak_rss = 0
+
+    def summary(self):
+        """
+        Returns a human readable multi-line summary.
+        """
+        lines = []
+        for name in ["stars", "people", "movies"]:
+            lines.append(f"{name}.csv: read {self.read[name]}, "
+                         f"kept {self.kept[name]}")
+        for reason, count in sorted(self.dropped.items()):
+            lines.append(f"dropped {count} ({reason})")
+        lines.append(f"peak memory {self.peak_rss // 2 ** 20} MB")
+        return "\n".join(lines)
+
+
+def stream_load(directory, people, movies, names,
+                chunk_size=100_000, memory_limit=None):
+    """
+    Fills the people, movies and names dictionaries (as in degrees.py)
+    while holding at most `chunk_size` CSV rows in memory at a time.
+
+    stars.csv is read first so that people and movies that never appear
+    in it are skipped. Raises MemoryError if the process grows past
+    `memory_limit` bytes.
+
+    Returns a LoadReport.
+    """
+    report = LoadReport()
+
+    def rows(name, columns, first_pass=True):
+        """
+        Yields the given columns of every well-formed row of a CSV file.
+        """
+        with open(f"{directory}/{name}.csv", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            header = next(reader)
+            positions = [header.index(column) for column in columns]
+            while True:
+                chunk = list(itertools.islice(reader, chunk_size))
+                if not chunk:
+                    break
+                for row in chunk:
+                    if len(row) != len(header):
+                        if first_pass:
+                            report.dropped[f"malformed {name} row"] += 1
+                        continue
+                    yield [row[i] for i in positions]
+                if first_pass:
+                    report.read[name] += len(chunk)
+                check_memory(report, memory_limit)
+
+    # Ids referenced by at least one star row
+    person_ids = set()
+    movie_ids = set()
+    for person_id, movie_id in rows("stars", ["person_id", "movie_id"]):
+        person_ids.add(person_id)
+        movie_ids.add(movie_id)
+
+    for person_id, name, birth in rows("people", ["id", "name", "birth"]):
+        if person_id not in person_ids:
+            report.dropped["person not in stars.csv"] += 1
+            continue
+        people[person_id] = {"name": name, "birth": birth, "movies": set()}
+        names.setdefault(name.lower(), set()).add(person_id)
+        report.kept["people"] += 1
+    del person_ids
+
+    for movie_id, title, year in rows("movies", ["id", "title", "year"]):
+        if movie_id not in movie_ids:
+            report.dropped["movie not in stars.csv"] += 1
+            continue
+        movies[movie_id] = {"title": title, "year": year, "stars": set()}
+        report.kept["movies"] += 1
+    del movie_ids
+
+    for person_id, movie_id in rows("stars", ["person_id", "movie_id"],
+                                     first_pass=False):
+        if person_id not in people:
+            report.dropped["star with unknown person"] += 1
+        elif movie_id not in movies:
+            report.dropped["star with unknown movie"] += 1
+        elif movie_id in people[person_id]["movies"]:
+            report.dropped["duplicate star"] += 1
+        else:
+            people[person_id]["movies"].add(movie_id)
+            movies[movie_id]["stars"].add(person_id)
+            report.kept["stars"] += 1
+
+    check_memory(report, memory_limit)
+    return report
+
+
+def check_memory(report, memory_limit):
+    """
+    Records peak memory use and raises MemoryError past `memory_limit`.
+    """
+    if resource is None:
+        return
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    report.peak_rss = peak if sys.platform == "darwin" else peak * 1024
+    if memory_limit is not None and report.peak_rss > memory_limit:
+        raise MemoryError(
+            f"loading used {report.peak_rss // 2 ** 20} MB, "
+            f"over the {memory_limit // 2 ** 20} MB limit")
@@ -0,0 +1,243 @@
+import mmap
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+
+from components import ComponentIndex
+from graph import CompactGraph
+
+SNAPSHOT = "degrees.snapshot"
+
+MAGIC = b"DEGSNAP1"
+
+# Magic, byte order (0 little, 1 big), number of sections
+HEADER = struct.Struct("<8sII")
+
+# Section name, byte offset, byte length
+SECTION = struct.Struct("<32sQQ")
+
+INT_SECTIONS = [
+    "person_offsets", "person_movies", "movie_offsets", "movie_stars",
+    "person_id_order", "movie_id_order", "name_order",
+]
+
+STRING_SECTIONS = [
+    "person_ids", "person_names", "person_births",
+    "movie_ids", "movie_titles", "movie_years",
+]
+
+
+def write_snapshot(graph, path):
+    """
+    Writes a CompactGraph to `path` in a format open_snapshot can mmap.
+    """
+    sections = []
+    for name in INT_SECTIONS[:4]:
+        sections.append((name, array("i", getattr(graph, name)).tobytes()))
+
+    sections.append(("person_id_order", sorted_order(graph.person_ids)))
+    sections.append(("movie_id_order", sorted_order(graph.movie_ids)))
+    sections.append(("name_order", sorted_order(
+        [name.lower() for name in graph.person_names])))
+    sections.append(("component_labels", graph.components.labels.tobytes()))
+    sections.append(("component_sizes", graph.components.sizes.tobytes()))
+
+    for name in STRING_SECTIONS:
+        offsets, blob = encode_strings(getattr(graph, name))
+        sections.append((f"{name}.offsets", offsets))
+        sections.append((f"{name}.blob", blob))
+
+    # Every section starts on an 8 byte boundary so it can be cast in place
+    position = align(HEADER.size + SECTION.size * len(sections))
+    directory = []
+    for name, data in sections:
+        directory.append((name, position, len(data)))
+        position = align(position + len(data))
+
+    byteorder = 0 if sys.byteorder == "little" else 1
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, byteorder, len(sections)))
+        for name, offset, length in directory:
+            f.write(SECTION.pack(name.encode("ascii"), offset, length))
+        for (name, offset, length), (_, data) in zip(directory, sections):
+            f.write(bytes(offset - f.tell()))
+            f.write(data)
+
+
+def open_snapshot(path):
+    """
+    Opens a snapshot written by write_snapshot without parsing it.
+    """
+    return SnapshotGraph(path)
+
+
+class SnapshotGraph(CompactGraph):
+    """
+    CompactGraph whose arrays are views into a memory-mapped snapshot.
+    Strings are only decoded when they are looked up.
+    """
+
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        self.buffer = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        sections = read_sections(memoryview(self.buffer))
+
+        ints = {name: sections[name].cast("i") for name in INT_SECTIONS}
+        strings = {
+            name: StringTable(sections[f"{name}.offsets"].cast("q"),
+                              sections[f"{name}.blob"])
+            for name in STRING_SECTIONS
+        }
+
+        # Snapshots written before components were stored get them
+        # recomputed by CompactGraph
+        components = None
+        if "component_labels" in sections:
+            components = ComponentIndex(sections["component_labels"].cast("i"),
+                                        sections["component_sizes"].cast("i"))
+
+        CompactGraph.__init__(
+            self,
+            strings["person_ids"], strings["person_names"],
+            strings["person_births"], strings["movie_ids"],
+            strings["movie_titles"], strings["movie_years"],
+            ints["person_offsets"], ints["person_movies"],
+            ints["movie_offsets"], ints["movie_stars"],
+            person_index=SortedIndex(strings["person_ids"],
+                                     ints["person_id_order"]),
+            movie_index=SortedIndex(strings["movie_ids"],
+                                    ints["movie_id_order"]),
+            names=NameIndex(strings["person_names"], ints["name_order"]),
+            components=components,
+        )
+
+
+class StringTable():
+    """
+    Read-only sequence of strings stored as an offsets array and a
+    UTF-8 blob, decoding one entry at a time.
+    """
+
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("string table index out of range")
+        return str(self.blob[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+class SortedIndex():
+    """
+    Maps strings to their position in `table` by binary search over
+    `order`, the table positions sorted by string.
+    """
+
+    def __init__(self, table, order):
+        self.table = table
+        self.order = order
+
+    def __getitem__(self, key):
+        i = bisect_left(self.order, key, key=self.table.__getitem__)
+        if i == len(self.order) or self.table[self.order[i]] != key:
+            raise KeyError(key)
+        return self.order[i]
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+
+class NameIndex():
+    """
+    Maps lowercased names to the list of table positions holding them,
+    by binary search over `order`, the positions sorted by lowercased name.
+    """
+
+    def __init__(self, table, order):
+        self.table = table
+        self.order = order
+
+    def key(self, i):
+        return self.table[i].lower()
+
+    def get(self, name, default=None):
+        lo = bisect_left(self.order, name, key=self.key)
+        hi = bisect_right(self.order, name, lo=lo, key=self.key)
+        if lo == hi:
+            return default
+        return list(self.order[lo:hi])
+
+
+def read_sections(view):
+    """
+    Returns a dict of section name to memoryview over the snapshot.
+    """
+    magic, byteorder, count = HEADER.unpack_from(view, 0)
+    if magic != MAGIC:
+        raise ValueError("not a degrees snapshot")
+    if byteorder != (0 if sys.byteorder == "little" else 1):
+        raise ValueError("snapshot was written with a different byte order")
+
+    sections = {}
+    for n in range(count):
+        name, offset, length = SECTION.unpack_from(
+            view, HEADER.size + n * SECTION.size)
+        sections[name.rstrip(b"\0").decode("ascii")] = view[offset:offset + length]
+    return sections
+
+
+def sorted_order(strings):
+    """
+    Returns the positions of `strings` in sorted order, as bytes.
+    """
+    order = sorted(range(len(strings)), key=strings.__getitem__)
+    return array("i", order).tobytes()
+
+
+def encode_strings(strings):
+    """
+    Returns (offsets, blob) bytes for a StringTable holding `strings`.
+    """
+    offsets = array("q", [0])
+    blob = bytearray()
+    for s in strings:
+        blob += s.encode("utf-8")
+        offsets.append(len(blob))
+    return offsets.tobytes(), bytes(blob)
+
+
+def align(position):
+    return (position + 7) & ~7
+
+
+def main():
+    if len(sys.argv) != 2:
+        sys.exit("Usage: python snapshot.py directory")
+    directory = sys.argv[1]
+
+    print("Loading data...")
+    graph = CompactGraph.from_csv(directory)
+    path = f"{directory}/{SNAPSHOT}"
+    write_snapshot(graph, path)
+    print(f"Wrote {path}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Batch position evaluation
+
+Returns the minimax value and a best move for many positions at once.
+Positions are 9-character strings read row by row ("X", "O" and "." or
+"-" for empty), or ints in the bitboard key format (x | o << 9).
+Symmetric copies of a position are solved once, and all searches share
+tictactoe's transposition table.
+
+    python batch.py [FILE]
+
+reads one position per line from FILE (default standard input) and
+prints "position value move" per line, with the move as a cell index
+(-1 once the game is over) and throughput on standard error.
+"""
+
+import sys
+import time
+from array import array
+
+import bitboard
+import tictactoe as ttt
+
+# Characters allowed in position strings
+MARKS = "XO.-"
+
+
+class BatchStats():
+    def __init__(self):
+        self.positions = 0
+        # Positions left after merging symmetric copies
+        self.unique = 0
+        self.seconds = 0.0
+
+    @property
+    def per_second(self):
+        return self.positions / self.seconds if self.seconds else 0.0
+
+
+def decode(position):
+    """
+    Returns the (x, o) masks for a position string or key.
+
+    Raises ValueError if it is malformed or could not arise in a game.
+    """
+    if isinstance(position, int):
+        if not 0 <= position < 1 << 18:
+            raise ValueError(f"position key out of range: {position}")
+        x, o = position & bitboard.FULL, position >> 9
+    else:
+        text = position.strip().upper()
+        if len(text) != 9 or any(c not in MARKS for c in text):
+            raise ValueError(f"not a position: {position!r}")
+        x = sum(1 << i for i, c in enumerate(text) if c == "X")
+        o = sum(1 << i for i, c in enumerate(text) if c == "O")
+
+    if x & o:
+        raise ValueError(f"cell marked twice: {position!r}")
+    if x.bit_count() - o.bit_count() not in (0, 1):
+        raise ValueError(f"impossible move counts: {position!r}")
+    if bitboard.WINNING[x] and bitboard.WINNING[o]:
+        raise ValueError(f"both players have won: {position!r}")
+    # The game stops at a win, so the winner made the last move
+    if bitboard.WINNING[x] and x.bit_count() != o.bit_count() + 1:
+        raise ValueError(f"O moved after X won: {position!r}")
+    if bitboard.WINNING[o] and x.bit_count() != o.bit_count():
+        raise ValueError(f"X moved after O won: {position!r}")
+    return x, o
+
+
+def encode(x, o):
+    """
+    Returns the string for the (x, o) masks.
+    """
+    return "".join("X" if x >> i & 1 else "O" if o >> i & 1 else "."
+                   for i in range(9))
+
+
+def evaluate_batch(positions, stats=None):
+    """
+    Returns (values, moves) for a sequence of positions: signed byte
+    arrays holding each position's minimax value and the cell index of
+    an optimal move, or -1 if the game is over.
+
+    If a BatchStats is given, the work done is recorded in it.
+    """
+    start = time.perf_counter()
+    values = array("b")
+    moves = array("b")
+
+    # Canonical key -> (value, cell on the canonical board)
+    solved = {}
+    for position in positions:
+        x, o = decode(position)
+        cx, co, symmetry = bitboard.canonical(x, o)
+        k = bitboard.key(cx, co)
+        entry = solved.get(k)
+        if entry is None:
+            entry = solved[k] = solve(cx, co)
+        value, cell = entry
+        values.append(value)
+        moves.append(-1 if cell is None else bitboard.restore(cell, symmetry))
+
+    if stats is not None:
+        stats.positions += len(values)
+        stats.unique += len(solved)
+        stats.seconds += time.perf_counter() - start
+    return values, moves
+
+
+def solve(x, o):
+    """
+    Returns (value, cell) for the position, with cell None if the game
+    is over.
+    """
+    value = ttt.minimax_value(x, o)
+    for i in bitboard.actions(x, o):
+        if ttt.minimax_value(*bitboard.result(x, o, i)) == value:
+            return value, i
+    return value, None
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python batch.py [FILE]")
+    if len(sys.argv) == 2:
+        with open(sys.argv[1]) as f:
+            lines = f.read().split()
+    else:
+        lines = sys.stdin.read().split()
+    positions = [int(line) if line.isdigit() else line for line in lines]
+
+    stats = BatchStats()
+    try:
+        values, moves = evaluate_batch(positions, stats)
+    except ValueError as e:
+        sys.exit(str(e))
+    for position, value, move in zip(lines, values, moves):
+        print(position, value, move)
+    print(f"{stats.positions} positions ({stats.unique} unique) in "
+          f"{stats.seconds:.3f}s, {stats.per_second:,.0f} positions/s",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+Benchmarks the tictactoe engines by self-play, without pygame.
+
+    python benchmark.py --games 1000 --engines minimax alphabeta > results.json
+
+For every engine, plays games of the AI against itself and against a
+random player (the AI taking X and O in turn), counting positions
+searched, the moves made and winner checks done inside the search, and
+how long each AI move took. Calls the game loop itself makes to result
+and winner are reported separately as driver calls.
+The AI must never lose; the exit status is 1 if it did. Results are
+printed as JSON, so two versions can be compared with diff.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+
+import book
+import tictactoe as ttt
+from tictactoe import O, X
+
+ENGINES = ["minimax", "alphabeta", "book"]
+
+
+@contextlib.contextmanager
+def instrument(calls):
+    """
+    Counts calls to result and winner through the tictactoe module in
+    `calls` until the block ends.
+
+    The searches work on bitboards directly, so this only measures the
+    game loop; their own work is counted in SearchStats.
+    """
+    originals = []
+    for module, name in [(ttt, "result"), (ttt, "winner")]:
+        function = getattr(module, name)
+        label = f"{module.__name__}.{name}"
+
+        def counted(*args, function=function, label=label):
+            calls[label] += 1
+            return function(*args)
+
+        originals.append((module, name, function))
+        setattr(module, name, counted)
+    try:
+        yield calls
+    finally:
+        for module, name, function in originals:
+            setattr(module, name, function)
+
+
+def ai_move(engine, board, stats):
+    if engine == "alphabeta":
+        return ttt.alphabeta(board, stats)
+    return ttt.minimax(board, stats=stats)
+
+
+def play_game(engine, opponent, ai_player, rng, latencies, stats, cold):
+    """
+    Plays one game from the empty board and returns the winner.
+
+    `opponent` is "ai" for self-play or "random". Every AI move's
+    latency in nanoseconds is appended to `latencies`.
+    """
+    board = ttt.initial_state()
+    while not ttt.terminal(board):
+        if opponent == "random" and ttt.player(board) != ai_player:
+            action = rng.choice(sorted(ttt.actions(board)))
+        else:
+            if cold:
+                ttt.transposition_table.clear()
+            start = time.perf_counter_ns()
+            action = ai_move(engine, board, stats)
+            latencies.append(time.perf_counter_ns() - start)
+        board = ttt.result(board, action)
+    return ttt.winner(board)
+
+
+def run(engine, games, seed, cold=False):
+    """
+    Returns the benchmark results of one engine as a dict.
+    """
+    rng = random.Random(seed)
+    ttt.transposition_table.clear()
+    ttt.opening_book = None
+    if engine == "book":
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, "book.bin")
+            book.write_book(book.solve(), filename)
+            if not ttt.load_book(filename):
+                raise Exception("could not load the opening book")
+
+    calls = Counter()
+    stats = ttt.SearchStats()
+    latencies = []
+    outcomes = {}
+    losses = 0
+    start = time.perf_counter()
+    with instrument(calls):
+        for opponent in ["ai", "random"]:
+            tally = Counter()
+            for game in range(games):
+                ai_player = X if game % 2 == 0 else O
+                win = play_game(engine, opponent, ai_player, rng,
+                                latencies, stats, cold)
+                if win is None:
+                    tally["draw"] += 1
+                elif opponent == "ai" or win != ai_player:
+                    # In self-play the AI is on both sides, so any win
+                    # is also a loss
+                    tally["ai_lost"] += 1
+                    losses += 1
+                else:
+                    tally["ai_won"] += 1
+            outcomes[opponent] = dict(sorted(tally.items()))
+    elapsed = time.perf_counter() - start
+    ttt.opening_book = None
+
+    latencies.sort()
+    return {
+        "engine": engine,
+        "cold": cold,
+        "games_per_opponent": games,
+        "outcomes": outcomes,
+        "ai_losses": losses,
+        "ai_moves": len(latencies),
+        "nodes": stats.nodes,
+        "nodes_per_move": round(stats.nodes / max(1, len(latencies)), 2),
+        "search": {
+            "results": stats.results,
+            "winner_checks": stats.winner_checks,
+        },
+        "driver_calls": dict(sorted(calls.items())),
+        "latency_us": latency_summary(latencies),
+        "elapsed_s": round(elapsed, 3),
+    }
+
+
+def latency_summary(latencies):
+    """
+    Returns percentiles of sorted nanosecond `latencies` in microseconds,
+    and a histogram of them in power-of-two microsecond buckets.
+    """
+    histogram = Counter()
+    for ns in latencies:
+        bucket = 1
+        while bucket * 1000 < ns:
+            bucket *= 2
+        histogram[bucket] += 1
+    return {
+        "p50": percentile(latencies, 50) / 1000 if latencies else None,
+        "p90": percentile(latencies, 90) / 1000 if latencies else None,
+        "p99": percentile(latencies, 99) / 1000 if latencies else None,
+        "max": latencies[-1] / 1000 if latencies else None,
+        "histogram": {f"<={bucket}": histogram[bucket]
+                      for bucket in sorted(histogram)},
+    }
+
+
+def percentile(values, q):
+    """
+    Returns the nearest-rank q-th percentile of sorted `values`.
+    """
+    rank = max(1, -(-q * len(values) // 100))
+    return values[rank - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--games", type=int, default=1000,
+                        help="games against each opponent, per engine")
+    parser.add_argument("--engines", nargs="+", choices=ENGINES,
+                        default=ENGINES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cold", action="store_true",
+                        help="clear the transposition table before every move")
+    args = parser.parse_args()
+
+    results = []
+    for engine in args.engines:
+        results.append(run(engine, args.games, args.seed, args.cold))
+        print(f"{engine} done", file=sys.stderr)
+
+    json.dump({"python": sys.version.split()[0], "results": results},
+              sys.stdout, indent=2)
+    print()
+    if any(result["ai_losses"] for result in results):
+        sys.exit("The AI lost a game")
+
+
+if __name__ == "__main__":
+    main()
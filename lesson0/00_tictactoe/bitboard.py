@@ -0,0 +1,182 @@
+"""
+Tic Tac Toe on bitboards
+
+A board is a pair of 9-bit masks (x, o), one per player, where bit
+i * 3 + j is set if that player has a mark in row i, column j.
+"""
+
+X = "X"
+O = "O"
+EMPTY = None
+
+FULL = 0b111111111
+
+# Masks of the eight lines of three
+LINES = [
+    0b000000111, 0b000111000, 0b111000000,  # rows
+    0b001001001, 0b010010010, 0b100100100,  # columns
+    0b100010001, 0b001010100,               # diagonals
+]
+
+# WINNING[mask] is True if the mask covers at least one whole line
+WINNING = [any(mask & line == line for line in LINES) for mask in range(FULL + 1)]
+
+# The eight symmetries of the board, as the (i, j) each cell moves to:
+# identity, three rotations, and four reflections
+SYMMETRIES = [
+    lambda i, j: (i, j),
+    lambda i, j: (j, 2 - i),
+    lambda i, j: (2 - i, 2 - j),
+    lambda i, j: (2 - j, i),
+    lambda i, j: (i, 2 - j),
+    lambda i, j: (2 - i, j),
+    lambda i, j: (j, i),
+    lambda i, j: (2 - j, 2 - i),
+]
+
+# PERMUTATIONS[s][c] is the cell that cell c moves to under symmetry s,
+# and INVERSES[s] undoes it
+PERMUTATIONS = [
+    [i * 3 + j for i, j in (f(*divmod(c, 3)) for c in range(9))]
+    for f in SYMMETRIES
+]
+INVERSES = [[p.index(c) for c in range(9)] for p in PERMUTATIONS]
+
+# TRANSFORMS[s][mask] is the mask with every cell moved by symmetry s
+TRANSFORMS = [
+    [sum(1 << p[c] for c in range(9) if mask >> c & 1)
+     for mask in range(FULL + 1)]
+    for p in PERMUTATIONS
+]
+
+
+def cell(action):
+    """
+    Returns the bit index of an (i, j) action.
+    """
+    i, j = action
+    return i * 3 + j
+
+
+def action(cell):
+    """
+    Returns the (i, j) action for a bit index.
+    """
+    return divmod(cell, 3)
+
+
+def from_board(board):
+    """
+    Returns the (x, o) masks for a list-of-lists board.
+    """
+    x = o = 0
+    for i in range(3):
+        for j in range(3):
+            if board[i][j] == X:
+                x |= 1 << (i * 3 + j)
+            elif board[i][j] == O:
+                o |= 1 << (i * 3 + j)
+    return x, o
+
+
+def to_board(x, o):
+    """
+    Returns the list-of-lists board for the (x, o) masks.
+    """
+    return [[X if x >> (i * 3 + j) & 1 else O if o >> (i * 3 + j) & 1 else EMPTY
+             for j in range(3)]
+            for i in range(3)]
+
+
+def key(x, o):
+    """
+    Returns a single int identifying the position.
+    """
+    return x | o << 9
+
+
+def canonical(x, o):
+    """
+    Returns (x, o, symmetry) for the canonical form of the position: of
+    its eight rotations and reflections, the one with the smallest key.
+    """
+    best = None
+    for s, transform in enumerate(TRANSFORMS):
+        tx, to = transform[x], transform[o]
+        k = tx | to << 9
+        if best is None or k < best:
+            best = k
+            form = (tx, to, s)
+    return form
+
+
+def canonical_key(x, o):
+    """
+    Returns the key shared by the position and all its symmetric copies.
+    """
+    return min(t[x] | t[o] << 9 for t in TRANSFORMS)
+
+
+def restore(i, symmetry):
+    """
+    Maps cell i of a canonical board back to the board it came from.
+    """
+    return INVERSES[symmetry][i]
+
+
+def player(x, o):
+    """
+    Returns player who has the next turn.
+    """
+    return X if x.bit_count() == o.bit_count() else O
+
+
+def actions(x, o):
+    """
+    Returns the bit indexes of the empty cells, or [] if the game is over.
+    """
+    if terminal(x, o):
+        return []
+    taken = x | o
+    return [i for i in range(9) if not taken >> i & 1]
+
+
+def result(x, o, i):
+    """
+    Returns the masks after the current player marks cell i.
+    """
+    bit = 1 << i
+    if (x | o) & bit:
+        raise Exception("Cant do action")
+    if x.bit_count() == o.bit_count():
+        return x | bit, o
+    return x, o | bit
+
+
+def winner(x, o):
+    """
+    Returns the winner of the game, if there is one.
+    """
+    if WINNING[x]:
+        return X
+    if WINNING[o]:
+        return O
+    return None
+
+
+def terminal(x, o):
+    """
+    Returns True if game is over, False otherwise.
+    """
+    return WINNING[x] or WINNING[o] or x | o == FULL
+
+
+def utility(x, o):
+    """
+    Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+    """
+    if WINNING[x]:
+        return 1
+    if WINNING[o]:
+        return -1
+    return 0
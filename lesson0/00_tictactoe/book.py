@@ -0,0 +1,139 @@
+"""
+Tic Tac Toe opening book
+
+Solves every reachable position once and stores the best move of each
+canonical position (see bitboard.canonical) in a small binary file, so
+a move can be played by lookup instead of search.
+
+    python book.py [filename]
+"""
+
+import os
+import struct
+import sys
+import zlib
+from array import array
+
+import bitboard
+
+BOOK = os.path.join(os.path.dirname(os.path.abspath(__file__)), "book.bin")
+
+MAGIC = b"TTTBOOK1"
+
+# Magic, number of entries, CRC-32 of the entries
+HEADER = struct.Struct("<8sII")
+
+
+def solve():
+    """
+    Returns a dict mapping the canonical key of every reachable,
+    unfinished position to (cell, value): the cell to play on the
+    canonical board and the position's minimax value.
+    """
+    values = {}
+    book = {}
+
+    def value(x, o):
+        key = bitboard.key(x, o)
+        if key not in values:
+            if bitboard.terminal(x, o):
+                values[key] = bitboard.utility(x, o)
+            else:
+                choose = max if bitboard.player(x, o) == bitboard.X else min
+                values[key] = choose(value(*bitboard.result(x, o, i))
+                                     for i in bitboard.actions(x, o))
+        return values[key]
+
+    def visit(x, o):
+        cx, co, _ = bitboard.canonical(x, o)
+        key = bitboard.key(cx, co)
+        if key in book or bitboard.terminal(cx, co):
+            return
+        target = value(cx, co)
+        cells = bitboard.actions(cx, co)
+        best = next(i for i in cells
+                    if value(*bitboard.result(cx, co, i)) == target)
+        book[key] = (best, target)
+        for i in cells:
+            visit(*bitboard.result(cx, co, i))
+
+    visit(0, 0)
+    return book
+
+
+def write_book(book, filename=BOOK):
+    """
+    Writes a book from solve() to a file.
+    """
+    entries = array("I", sorted(
+        key << 8 | cell << 2 | value + 1
+        for key, (cell, value) in book.items()
+    ))
+    # Stored little-endian whatever the machine
+    if sys.byteorder == "big":
+        entries.byteswap()
+    payload = entries.tobytes()
+    with open(filename, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(entries), zlib.crc32(payload)))
+        f.write(payload)
+
+
+def read_book(filename=BOOK):
+    """
+    Returns the book stored in a file as a dict like solve() returns.
+
+    Raises ValueError if the file is corrupt, an entry is not a legal
+    move on its position, or a move does not keep the position's value.
+    """
+    with open(filename, "rb") as f:
+        data = f.read()
+    if len(data) < HEADER.size:
+        raise ValueError("book is truncated")
+    magic, count, checksum = HEADER.unpack_from(data)
+    payload = data[HEADER.size:]
+    if magic != MAGIC:
+        raise ValueError("not a tictactoe book")
+    if len(payload) != count * 4 or zlib.crc32(payload) != checksum:
+        raise ValueError("book checksum does not match")
+
+    entries = array("I")
+    entries.frombytes(payload)
+    if sys.byteorder == "big":
+        entries.byteswap()
+
+    book = {}
+    for entry in entries:
+        key, cell, value = entry >> 8, entry >> 2 & 0b1111, (entry & 0b11) - 1
+        x, o = key & bitboard.FULL, key >> 9
+        if (bitboard.canonical_key(x, o) != key or bitboard.terminal(x, o)
+                or cell > 8 or (x | o) >> cell & 1):
+            raise ValueError(f"book entry {entry} is not a legal move")
+        book[key] = (cell, value)
+    if bitboard.key(0, 0) not in book:
+        raise ValueError("book has no entry for the empty board")
+
+    # Every book move must lead to a finished game or another book
+    # position with the same value
+    for key, (cell, value) in book.items():
+        x, o = bitboard.result(key & bitboard.FULL, key >> 9, cell)
+        if bitboard.terminal(x, o):
+            follows = bitboard.utility(x, o)
+        else:
+            follows = book.get(bitboard.canonical_key(x, o), (None, None))[1]
+        if follows != value:
+            raise ValueError(f"book move for position {key} loses value")
+    return book
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python book.py [filename]")
+    filename = sys.argv[1] if len(sys.argv) == 2 else BOOK
+
+    book = solve()
+    write_book(book, filename)
+    print(f"Wrote {len(book)} positions to {filename}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,4 +10,6 @@ if __name__ == "__main__":
     board = [[EMPTY, EMPTY, EMPTY], [X, O, O], [EMPTY, X, EMPTY]]
     expected = (2, 0)
     print(tictactoe.minimax(board))
+    print(tictactoe.alphabeta(board))
+    print(tictactoe.pruning_report(tictactoe.initial_state()))
 
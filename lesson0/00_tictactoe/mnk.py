@@ -0,0 +1,277 @@
+"""
+m,n,k-game Player
+
+Tic Tac Toe generalized to an m x n board where k in a row wins, with
+the same initial_state/player/actions/result/winner/terminal/utility/
+minimax API as tictactoe.py. Boards too big to search exhaustively are
+searched with iterative deepening under a time budget, scoring the
+positions where the search stops with a heuristic.
+"""
+
+import time
+
+from tictactoe import EMPTY, O, X, SearchStats
+
+
+# Seconds a search on a board bigger than 3x3 may take by default
+TIME_LIMIT = 1.0
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class MNKGame():
+
+    def __init__(self, m=3, n=3, k=3, time_limit=None):
+        """
+        `time_limit` is the default search budget in seconds. Boards
+        bigger than 3x3 get TIME_LIMIT unless one is given, since searching
+        them to the end of the game would take far too long.
+        """
+        if k > max(m, n):
+            raise ValueError("k cannot be longer than the board")
+        self.m = m
+        self.n = n
+        self.k = k
+        if time_limit is None and m * n > 9:
+            time_limit = TIME_LIMIT
+        self.time_limit = time_limit
+        self.full = (1 << (m * n)) - 1
+        self.lines = self.win_lines()
+
+        # A line scores WEIGHTS[c] when a player has c marks in it and the
+        # other player has none; completing one is worth more than any sum
+        self.weights = [0] + [10 ** (c - 1) for c in range(1, k)]
+        self.win = 10 ** (k + 1) * len(self.lines)
+
+        # Cells nearest the center first, which tends to find good moves
+        # (and so cutoffs) earliest
+        center = ((m - 1) / 2, (n - 1) / 2)
+        self.cell_order = sorted(
+            range(m * n),
+            key=lambda c: abs(c // n - center[0]) + abs(c % n - center[1]))
+
+    def win_lines(self):
+        """
+        Returns a bitmask for every run of k cells in a row, column or
+        diagonal.
+        """
+        m, n, k = self.m, self.n, self.k
+        lines = []
+        for di, dj in [(0, 1), (1, 0), (1, 1), (1, -1)]:
+            for i in range(m):
+                for j in range(n):
+                    end_i, end_j = i + di * (k - 1), j + dj * (k - 1)
+                    if not (0 <= end_i < m and 0 <= end_j < n):
+                        continue
+                    mask = 0
+                    for step in range(k):
+                        mask |= 1 << ((i + di * step) * n + j + dj * step)
+                    lines.append(mask)
+        return lines
+
+    def initial_state(self):
+        """
+        Returns starting state of the board.
+        """
+        return [[EMPTY] * self.n for _ in range(self.m)]
+
+    def player(self, board):
+        """
+        Returns player who has the next turn on a board.
+        """
+        return self.turn(*self.masks(board))
+
+    def actions(self, board):
+        """
+        Returns set of all possible actions (i, j) available on the board.
+        """
+        if self.terminal(board):
+            return set()
+        return {(i, j) for i in range(self.m) for j in range(self.n)
+                if board[i][j] == EMPTY}
+
+    def result(self, board, action):
+        """
+        Returns the board that results from making move (i, j) on the board.
+        """
+        i, j = action
+        if not (0 <= i < self.m and 0 <= j < self.n) or board[i][j] is not EMPTY:
+            raise Exception("Cant do action")
+        new_board = [row[:] for row in board]
+        new_board[i][j] = self.player(board)
+        return new_board
+
+    def winner(self, board):
+        """
+        Returns the winner of the game, if there is one.
+        """
+        return self.winner_of(*self.masks(board))
+
+    def terminal(self, board):
+        """
+        Returns True if game is over, False otherwise.
+        """
+        x, o = self.masks(board)
+        return self.winner_of(x, o) is not None or x | o == self.full
+
+    def utility(self, board):
+        """
+        Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+        """
+        win = self.winner(board)
+        return 1 if win == X else -1 if win == O else 0
+
+    def minimax(self, board, time_limit=None, max_depth=None, stats=None):
+        """
+        Returns the best action found for the current player on the board.
+
+        Searches one ply deeper at a time until `max_depth` plies, the end
+        of the game, or `time_limit` seconds (by default the game's own
+        limit), and returns the best action of the deepest search that
+        finished. The first ply always finishes.
+        """
+        x, o = self.masks(board)
+        if self.winner_of(x, o) is not None or x | o == self.full:
+            return None
+        if stats is None:
+            stats = SearchStats()
+
+        empty = self.m * self.n - (x | o).bit_count()
+        # The first ply always runs, so there is a move to return
+        if max_depth is None:
+            max_depth = empty
+        max_depth = max(1, min(max_depth, empty))
+        deadline = self.deadline(time_limit)
+
+        best = None
+        for depth in range(1, max_depth + 1):
+            try:
+                best, value = self.search_root(
+                    x, o, depth, best, stats, deadline if depth > 1 else None)
+            except SearchTimeout:
+                break
+            # A forced win or loss will not change with more depth
+            if abs(value) >= self.win:
+                break
+        return divmod(best, self.n)
+
+    def deadline(self, time_limit=None):
+        """
+        Returns the monotonic time a search starting now must stop by, or
+        None if it has no limit.
+        """
+        if time_limit is None:
+            time_limit = self.time_limit
+        return None if time_limit is None else time.monotonic() + time_limit
+
+    def search_root(self, x, o, depth, first, stats, deadline):
+        """
+        Returns (cell, value) of the best move from the position searched
+        `depth` plies deep, trying `first` before the other moves.
+        """
+        maximizing = self.turn(x, o) == X
+        order = self.cell_order
+        if first is not None:
+            order = [first] + [c for c in order if c != first]
+
+        taken = x | o
+        best_cell = None
+        alpha, beta = -self.win * 2, self.win * 2
+        for c in order:
+            if taken >> c & 1:
+                continue
+            if maximizing:
+                value = self.alphabeta_score(x | 1 << c, o, depth - 1,
+                                             alpha, beta, stats, deadline)
+                if best_cell is None or value > alpha:
+                    best_cell, alpha = c, value
+            else:
+                value = self.alphabeta_score(x, o | 1 << c, depth - 1,
+                                             alpha, beta, stats, deadline)
+                if best_cell is None or value < beta:
+                    best_cell, beta = c, value
+        return best_cell, alpha if maximizing else beta
+
+    def alphabeta_score(self, x, o, depth, alpha, beta, stats, deadline=None):
+        """
+        Returns the value of the (x, o) position searched `depth` plies
+        deep, from X's point of view, if it lies strictly between alpha
+        and beta, otherwise a bound on the side of the window it fell.
+
+        Raises SearchTimeout once the monotonic clock passes `deadline`.
+        """
+        stats.nodes += 1
+        if deadline is not None and stats.nodes % 1024 == 0:
+            if time.monotonic() > deadline:
+                raise SearchTimeout()
+
+        win = self.winner_of(x, o)
+        if win is not None:
+            # Prefer quicker wins and slower losses
+            return self.win + depth if win == X else -self.win - depth
+        taken = x | o
+        if taken == self.full:
+            return 0
+        if depth == 0:
+            return self.evaluate(x, o)
+
+        if self.turn(x, o) == X:
+            value = -self.win * 2
+            for c in self.cell_order:
+                if taken >> c & 1:
+                    continue
+                value = max(value, self.alphabeta_score(
+                    x | 1 << c, o, depth - 1, alpha, beta, stats, deadline))
+                alpha = max(alpha, value)
+                if alpha >= beta:
+                    break
+        else:
+            value = self.win * 2
+            for c in self.cell_order:
+                if taken >> c & 1:
+                    continue
+                value = min(value, self.alphabeta_score(
+                    x, o | 1 << c, depth - 1, alpha, beta, stats, deadline))
+                beta = min(beta, value)
+                if alpha >= beta:
+                    break
+        return value
+
+    def evaluate(self, x, o):
+        """
+        Returns a heuristic value of a position from X's point of view:
+        lines still open to one player score by how many marks they hold.
+        """
+        score = 0
+        for line in self.lines:
+            if not line & o:
+                score += self.weights[(line & x).bit_count()]
+            elif not line & x:
+                score -= self.weights[(line & o).bit_count()]
+        return score
+
+    def masks(self, board):
+        """
+        Returns the (x, o) bitmasks for the board, bit i * n + j per cell.
+        """
+        x = o = 0
+        for i in range(self.m):
+            for j in range(self.n):
+                if board[i][j] == X:
+                    x |= 1 << (i * self.n + j)
+                elif board[i][j] == O:
+                    o |= 1 << (i * self.n + j)
+        return x, o
+
+    def turn(self, x, o):
+        return X if x.bit_count() == o.bit_count() else O
+
+    def winner_of(self, x, o):
+        for line in self.lines:
+            if x & line == line:
+                return X
+            if o & line == line:
+                return O
+        return None
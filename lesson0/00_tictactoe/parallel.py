@@ -0,0 +1,179 @@
+"""
+Parallel root-split minimax
+
+Searches each action at the root of the game tree in its own task on a
+process pool. Workers share the best value found so far, so subtrees
+searched later start with a tighter alpha-beta window.
+"""
+
+import multiprocessing
+import os
+
+import bitboard
+import tictactoe as ttt
+from mnk import SearchTimeout
+from tictactoe import X, SearchStats
+
+# Stands in for "no value yet" in the shared bound
+UNSET = 2 ** 62
+
+# Set in each worker by init_worker
+shared = None
+
+
+def init_worker(value):
+    global shared
+    shared = value
+
+
+def score_subtree(task):
+    """
+    Returns (index, value, nodes) for one root action, searched with the
+    shared best value as its bound, or a value of None if the search ran
+    past its deadline.
+
+    The bound is loosened by one so a subtree that only ties the best
+    still gets an exact value, which keeps the choice between equally
+    good actions the same as a sequential search. Scores must be ints.
+    """
+    index, x, o, maximizing, game, depth, deadline = task
+    stats = SearchStats()
+    with shared.get_lock():
+        best = shared.value
+
+    alpha, beta = (-UNSET, UNSET)
+    if best != -UNSET and best != UNSET:
+        if maximizing:
+            alpha = best - 1
+        else:
+            beta = best + 1
+
+    if game is None:
+        value = ttt.alphabeta_score(x, o, alpha, beta, stats)
+    else:
+        try:
+            value = game.alphabeta_score(x, o, depth, alpha, beta, stats,
+                                         deadline)
+        except SearchTimeout:
+            return index, None, stats.nodes
+
+    with shared.get_lock():
+        if shared.value == (-UNSET if maximizing else UNSET):
+            shared.value = value
+        elif maximizing:
+            shared.value = max(shared.value, value)
+        else:
+            shared.value = min(shared.value, value)
+    return index, value, stats.nodes
+
+
+class RootSplitter():
+    """
+    Process pool for splitting searches at the root. Reuse one across
+    moves to avoid starting processes every time.
+
+    With `game` (an mnk.MNKGame) searches that game to a fixed depth, or
+    one ply deeper at a time within the game's time limit, otherwise
+    searches 3x3 tic-tac-toe to the end.
+    """
+
+    def __init__(self, workers=None, game=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.game = game
+        context = multiprocessing.get_context()
+        self.bound = context.Value("q", 0)
+        self.pool = context.Pool(self.workers, init_worker, (self.bound,))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.pool.terminate()
+        self.pool.join()
+
+    def minimax(self, board, depth=None, stats=None):
+        """
+        Returns the same action as the sequential search: the first root
+        action, in the sequential search's order, with the best value.
+
+        For an m,n,k game without a `depth`, deepens like MNKGame.minimax
+        until the game's time limit and returns the best action of the
+        deepest search that finished.
+        """
+        game = self.game
+        if stats is None:
+            stats = SearchStats()
+
+        if game is None:
+            if ttt.terminal(board):
+                return None
+            x, o = bitboard.from_board(board)
+            maximizing = ttt.player(board) == X
+            cells = [bitboard.cell(action) for action in ttt.actions(board)]
+            best, _ = self.search_root(x, o, maximizing, cells, None, None,
+                                       stats)
+            return bitboard.action(best)
+
+        if game.terminal(board):
+            return None
+        x, o = game.masks(board)
+        maximizing = game.player(board) == X
+        taken = x | o
+        cells = [c for c in game.cell_order if not taken >> c & 1]
+        empty = len(cells)
+        deadline = None
+        if depth is None:
+            deadline = game.deadline()
+            depth = empty
+        depth = max(1, min(depth, empty))
+
+        best = None
+        # Without a deadline the deepest search is the only one needed
+        for d in range(1 if deadline is not None else depth, depth + 1):
+            if best is not None:
+                cells = [best] + [c for c in cells if c != best]
+            found, value = self.search_root(
+                x, o, maximizing, cells, d, deadline if d > 1 else None,
+                stats)
+            if found is None:
+                break
+            best = found
+            # A forced win or loss will not change with more depth
+            if abs(value) >= game.win:
+                break
+        return divmod(best, game.n)
+
+    def search_root(self, x, o, maximizing, cells, depth, deadline, stats):
+        """
+        Returns (cell, value) of the best of `cells` searched `depth` plies
+        deep in parallel, or (None, None) if the deadline passed first.
+        """
+        tasks = []
+        for index, c in enumerate(cells):
+            child = (x | 1 << c, o) if maximizing else (x, o | 1 << c)
+            tasks.append((index, *child, maximizing, self.game,
+                          None if depth is None else depth - 1, deadline))
+
+        self.bound.value = -UNSET if maximizing else UNSET
+        values = [None] * len(tasks)
+        for index, value, nodes in self.pool.imap_unordered(
+                score_subtree, tasks):
+            values[index] = value
+            stats.nodes += nodes
+        if None in values:
+            return None, None
+
+        best = max(values) if maximizing else min(values)
+        return cells[values.index(best)], best
+
+
+def parallel_minimax(board, workers=None, game=None, depth=None):
+    """
+    Returns the optimal action for the current player on the board,
+    searching the root actions in parallel on a temporary process pool.
+    """
+    with RootSplitter(workers, game) as splitter:
+        return splitter.minimax(board, depth)
@@ -3,11 +3,44 @@ Tic Tac Toe Player
 """
 
 import copy
+import json
+
+import bitboard
+import book
 
 X = "X"
 O = "O"
 EMPTY = None
 
+# Maps positions (see bitboard.canonical_key) to their minimax value, so
+# the eight rotations and reflections of a board share one entry. Shared
+# by every call and every game, and can be saved with save_table.
+transposition_table = {}
+
+# Version of the file save_table writes
+TABLE_FORMAT = 2
+
+# Order alphabeta tries moves in: center, then corners, then edges, since
+# those take part in the most lines and cause the earliest cutoffs
+MOVE_ORDER = [(1, 1),
+              (0, 0), (0, 2), (2, 0), (2, 2),
+              (0, 1), (1, 0), (1, 2), (2, 1)]
+CELL_ORDER = [bitboard.cell(action) for action in MOVE_ORDER]
+
+
+# Maps canonical positions to (cell, value) once load_book succeeds
+opening_book = None
+
+
+class SearchStats():
+    def __init__(self):
+        # Number of positions a search visited
+        self.nodes = 0
+        # Moves the search made and positions it checked for a winner,
+        # whether through result/winner or directly on bitboards
+        self.results = 0
+        self.winner_checks = 0
+
 
 def initial_state():
     """
@@ -119,34 +152,158 @@ def utility(board):
 
 
 def minimax_score(board, depth):
-    if terminal(board):
-        return utility(board)
+    return minimax_value(*bitboard.from_board(board))
 
-    if player(board) == X:
-        value = -10
-        for action in actions(board):
-            value = max(value, minimax_score(result(board, action), depth+1))
+
+def minimax_value(x, o, stats=None):
+    """
+    Returns the minimax value of the (x, o) bitboard position. If a
+    SearchStats is given, visited positions are counted in it.
+    """
+    if stats is not None:
+        stats.nodes += 1
+    key = bitboard.canonical_key(x, o)
+    value = transposition_table.get(key)
+    if value is not None:
         return value
+
+    if stats is not None:
+        stats.winner_checks += 1
+    if bitboard.terminal(x, o):
+        value = bitboard.utility(x, o)
     else:
-        value = 10
-        for action in actions(board):
-            value = min(value, minimax_score(result(board, action), depth+1))
-        return value
+        cells = bitboard.actions(x, o)
+        if stats is not None:
+            stats.results += len(cells)
+        if bitboard.player(x, o) == X:
+            value = -10
+            for i in cells:
+                value = max(value,
+                            minimax_value(*bitboard.result(x, o, i), stats))
+        else:
+            value = 10
+            for i in cells:
+                value = min(value,
+                            minimax_value(*bitboard.result(x, o, i), stats))
+
+    transposition_table[key] = value
+    return value
+
+
+def canonicalize(board):
+    """
+    Returns (canonical_board, symmetry), where canonical_board is the
+    representative of the board's eight rotations and reflections.
+    Actions chosen on canonical_board are mapped back with restore_action.
+    """
+    x, o, symmetry = bitboard.canonical(*bitboard.from_board(board))
+    return bitboard.to_board(x, o), symmetry
+
+
+def restore_action(action, symmetry):
+    """
+    Maps an action on a canonical board back to the original board.
+    """
+    return bitboard.action(bitboard.restore(bitboard.cell(action), symmetry))
+
+
+def load_book(filename=book.BOOK):
+    """
+    Loads the opening book written by book.py so minimax becomes a lookup.
+
+    Returns False, and keeps searching live, if the book is missing or
+    fails verification.
+    """
+    global opening_book
+    try:
+        opening_book = book.read_book(filename)
+    except (OSError, ValueError):
+        opening_book = None
+    return opening_book is not None
+
+
+def save_table(filename):
+    """
+    Writes the transposition table to a JSON file.
+    """
+    with open(filename, "w") as f:
+        json.dump({"format": TABLE_FORMAT, "table": transposition_table}, f)
+
+
+def load_table(filename):
+    """
+    Adds the positions from a file written by save_table to the table.
 
-def minimax(board, depth=1):
+    Files from before the format was versioned, keyed by board string or
+    by plain bitboard key, are converted. Returns False, leaving the
+    table unchanged, if the file is missing, corrupt or of another format.
+    """
+    try:
+        with open(filename) as f:
+            data = json.load(f)
+        if not isinstance(data, dict):
+            return False
+        if "format" in data:
+            if data["format"] != TABLE_FORMAT:
+                return False
+            entries = {int(key): table_value(value)
+                       for key, value in data["table"].items()}
+        else:
+            entries = {legacy_key(key): table_value(value)
+                       for key, value in data.items()}
+    except (OSError, ValueError, TypeError, AttributeError):
+        return False
+    transposition_table.update(entries)
+    return True
+
+
+def legacy_key(key):
+    """
+    Returns the canonical key for a key from an unversioned table file:
+    a board string such as "X.O......" or a plain bitboard key.
+    """
+    if len(key) == 9 and set(key) <= {X, O, "."}:
+        x = sum(1 << i for i, c in enumerate(key) if c == X)
+        o = sum(1 << i for i, c in enumerate(key) if c == O)
+    else:
+        k = int(key)
+        x, o = k & bitboard.FULL, k >> 9
+    return bitboard.canonical_key(x, o)
+
+
+def table_value(value):
+    if value not in (-1, 0, 1) or isinstance(value, bool):
+        raise ValueError(f"not a minimax value: {value!r}")
+    return value
+
+def minimax(board, depth=1, stats=None):
     """
     Returns the optimal action for the current player on the board.
+
+    Looks the board up in the opening book if one is loaded, and
+    searches otherwise. If a SearchStats is given, visited positions
+    are counted in it.
     """
     if terminal(board):
         return None
 
+    if opening_book is not None:
+        x, o, symmetry = bitboard.canonical(*bitboard.from_board(board))
+        entry = opening_book.get(bitboard.key(x, o))
+        if entry is not None:
+            return bitboard.action(bitboard.restore(entry[0], symmetry))
+
     # X wants to maximize score
     best_action = None
     acts = actions(board)
+    if stats is not None:
+        stats.winner_checks += 1
+        stats.results += len(acts)
+    x, o = bitboard.from_board(board)
     if player(board) == X:
         max = -10
         for action in acts:
-            other_player_util = minimax_score(result(board,action), depth+1) # Get the greatest utility
+            other_player_util = minimax_value(*bitboard.result(x, o, bitboard.cell(action)), stats) # Get the greatest utility
 
             # If i found an action that maximizes utility
             if other_player_util > max:
@@ -157,10 +314,118 @@ def minimax(board, depth=1):
     else:
         min = 10
         for action in acts:
-            other_player_util = minimax_score(result(board,action), depth+1) # Get the greatest utility
+            other_player_util = minimax_value(*bitboard.result(x, o, bitboard.cell(action)), stats) # Get the greatest utility
 
             if other_player_util < min:
                 min = other_player_util  
                 best_action = action
         return best_action
 
+
+def alphabeta(board, stats=None):
+    """
+    Returns the optimal action for the current player on the board,
+    using minimax with alpha-beta pruning.
+
+    Root actions are tried in the same order as minimax and only a
+    strictly better value replaces the best action, so both return the
+    same action. If a SearchStats is given, visited positions are
+    counted in it.
+    """
+    if stats is None:
+        stats = SearchStats()
+    stats.nodes += 1
+    stats.winner_checks += 1
+    if terminal(board):
+        return None
+
+    x, o = bitboard.from_board(board)
+    maximizing = player(board) == X
+    best_action = None
+    best = -10 if maximizing else 10
+    alpha, beta = -10, 10
+    for action in actions(board):
+        stats.results += 1
+        child = bitboard.result(x, o, bitboard.cell(action))
+        value = alphabeta_score(*child, alpha, beta, stats)
+        if maximizing and value > best:
+            best, best_action = value, action
+            alpha = best
+        elif not maximizing and value < best:
+            best, best_action = value, action
+            beta = best
+
+        # Nothing can beat a win, so the remaining actions cannot change
+        # the answer
+        if best == (1 if maximizing else -1):
+            break
+    return best_action
+
+
+def alphabeta_score(x, o, alpha, beta, stats):
+    """
+    Returns the minimax value of the (x, o) bitboard position if it lies
+    strictly between alpha and beta, otherwise a bound on the side of the
+    window it fell.
+    """
+    stats.nodes += 1
+    stats.winner_checks += 1
+    if bitboard.terminal(x, o):
+        return bitboard.utility(x, o)
+
+    taken = x | o
+    if bitboard.player(x, o) == X:
+        value = -10
+        for i in CELL_ORDER:
+            if taken >> i & 1:
+                continue
+            stats.results += 1
+            value = max(value, alphabeta_score(x | 1 << i, o,
+                                               alpha, beta, stats))
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                break
+    else:
+        value = 10
+        for i in CELL_ORDER:
+            if taken >> i & 1:
+                continue
+            stats.results += 1
+            value = min(value, alphabeta_score(x, o | 1 << i,
+                                               alpha, beta, stats))
+            beta = min(beta, value)
+            if alpha >= beta:
+                break
+    return value
+
+
+def tree_size(board):
+    """
+    Returns the number of positions in the full game tree below the board,
+    which is how many an unpruned, uncached minimax visits.
+    """
+    sizes = {}
+
+    def size(x, o):
+        key = bitboard.key(x, o)
+        if key not in sizes:
+            sizes[key] = 1 + sum(size(*bitboard.result(x, o, i))
+                                 for i in bitboard.actions(x, o))
+        return sizes[key]
+
+    return size(*bitboard.from_board(board))
+
+
+def pruning_report(board):
+    """
+    Returns how many positions alphabeta visits on the board compared to
+    the full game tree.
+    """
+    stats = SearchStats()
+    alphabeta(board, stats)
+    size = tree_size(board)
+    return {
+        "tree_nodes": size,
+        "alphabeta_nodes": stats.nodes,
+        "pruned_fraction": 1 - stats.nodes / size,
+    }
@@ -0,0 +1,257 @@
+
+import time
+
+import pytest
+
+import batch
+import benchmark
+import bitboard
+import book
+import mnk
+import parallel
+import tictactoe as ttt
+import worker
+from tictactoe import EMPTY, O, X
+
+
+def reference_value(board):
+    """
+    Plain minimax value, without any caching or pruning.
+    """
+    if ttt.terminal(board):
+        return ttt.utility(board)
+    values = [reference_value(ttt.result(board, action))
+              for action in ttt.actions(board)]
+    return max(values) if ttt.player(board) == X else min(values)
+
+
+boards = [
+    [[EMPTY, EMPTY, EMPTY], [X, O, O], [EMPTY, X, EMPTY]],
+    [[X, EMPTY, EMPTY], [EMPTY, O, EMPTY], [EMPTY, EMPTY, X]],
+    [[O, X, EMPTY], [EMPTY, X, EMPTY], [EMPTY, EMPTY, EMPTY]],
+    [[X, O, X], [EMPTY, O, EMPTY], [EMPTY, EMPTY, EMPTY]],
+]
+
+
+def reachable(board=None, seen=None):
+    """
+    Returns every position reachable from the board, keyed by bitboard.
+    """
+    if board is None:
+        board, seen = ttt.initial_state(), {}
+    key = bitboard.key(*bitboard.from_board(board))
+    if key not in seen:
+        seen[key] = board
+        for action in ttt.actions(board):
+            reachable(ttt.result(board, action), seen)
+    return seen
+
+
+def test_bitboard_agrees_with_lists():
+    positions = reachable()
+    assert len(positions) == 5478
+    for board in positions.values():
+        x, o = bitboard.from_board(board)
+        assert bitboard.to_board(x, o) == board
+        assert bitboard.player(x, o) == ttt.player(board)
+        assert bitboard.winner(x, o) == ttt.winner(board)
+        assert bitboard.terminal(x, o) == ttt.terminal(board)
+        assert ({bitboard.action(i) for i in bitboard.actions(x, o)}
+                == ttt.actions(board))
+
+
+@pytest.mark.parametrize("board", boards)
+def test_minimax_plays_an_optimal_move(board):
+    action = ttt.minimax(board)
+    assert reference_value(ttt.result(board, action)) == reference_value(board)
+
+
+def test_transposition_table_round_trip(tmp_path):
+    ttt.minimax(ttt.initial_state())
+    saved = dict(ttt.transposition_table)
+    ttt.save_table(tmp_path / "table.json")
+    ttt.transposition_table.clear()
+    assert ttt.load_table(tmp_path / "table.json")
+    assert ttt.transposition_table == saved
+
+    # Unversioned files keyed by board string or by plain bitboard key
+    ttt.transposition_table.clear()
+    (tmp_path / "strings.json").write_text('{"X.O......": 1, "XXXOO....": 1}')
+    assert ttt.load_table(tmp_path / "strings.json")
+    (tmp_path / "ints.json").write_text('{"%d": 0}' % (1 << 4))
+    assert ttt.load_table(tmp_path / "ints.json")
+    assert ttt.transposition_table == {
+        bitboard.canonical_key(0b000000001, 0b000000100): 1,
+        bitboard.canonical_key(0b000000111, 0b000011000): 1,
+        bitboard.canonical_key(0b000010000, 0): 0,
+    }
+
+    for text in ['{"format": 99, "table": {}}', '{"junk": 1}', "[1]", "{"]:
+        (tmp_path / "bad.json").write_text(text)
+        assert not ttt.load_table(tmp_path / "bad.json")
+    assert not ttt.load_table(tmp_path / "missing.json")
+    ttt.transposition_table.clear()
+
+
+@pytest.mark.parametrize("board", boards + [ttt.initial_state()])
+def test_alphabeta_matches_minimax(board):
+    stats = ttt.SearchStats()
+    assert ttt.alphabeta(board, stats) == ttt.minimax(board)
+    assert stats.nodes < ttt.tree_size(board)
+
+
+def test_canonical_actions_map_back():
+    for board in reachable().values():
+        canonical, symmetry = ttt.canonicalize(board)
+        assert ttt.minimax_score(canonical, 0) == ttt.minimax_score(board, 0)
+        for action in ttt.actions(canonical):
+            original = ttt.restore_action(action, symmetry)
+            assert original in ttt.actions(board)
+            assert (ttt.canonicalize(ttt.result(board, original))[0]
+                    == ttt.canonicalize(ttt.result(canonical, action))[0])
+
+
+@pytest.mark.parametrize("board", boards + [ttt.initial_state()])
+def test_mnk_engine_plays_perfectly_on_3x3(board):
+    game = mnk.MNKGame(3, 3, 3)
+    assert game.winner(board) == ttt.winner(board)
+    action = game.minimax(board)
+    assert (ttt.minimax_score(ttt.result(board, action), 0)
+            == ttt.minimax_score(board, 0))
+
+
+def test_mnk_engine_respects_time_budget():
+    game = mnk.MNKGame(5, 5, 4)
+    assert len(game.lines) == 28
+    assert game.time_limit == mnk.TIME_LIMIT
+    assert mnk.MNKGame(3, 3, 3).time_limit is None
+    board = game.initial_state()
+    action = game.minimax(board, time_limit=0.05)
+    assert action in game.actions(board)
+    assert game.minimax(board, max_depth=0) in game.actions(board)
+
+    # Deepening to two plies visits each move twice and each reply once
+    stats = ttt.SearchStats()
+    assert game.minimax(board, max_depth=2, stats=stats) in game.actions(board)
+    assert stats.nodes <= 2 * 25 + 25 * 24
+
+
+def test_mnk_default_budget_stops_search():
+    game = mnk.MNKGame(4, 4, 4, time_limit=0.05)
+    stats = ttt.SearchStats()
+    action = game.minimax(game.initial_state(), stats=stats)
+    assert action in game.actions(game.initial_state())
+    # An exhaustive search of the empty 4x4 board visits far more
+    assert stats.nodes < 10 ** 7
+
+    with parallel.RootSplitter(workers=2, game=game) as splitter:
+        assert splitter.minimax(game.initial_state()) in game.actions(
+            game.initial_state())
+
+
+def test_parallel_search_matches_sequential():
+    with parallel.RootSplitter(workers=2) as splitter:
+        for board in boards + [ttt.initial_state()]:
+            assert splitter.minimax(board) == ttt.minimax(board)
+
+    game = mnk.MNKGame(4, 4, 3)
+    board = game.result(game.initial_state(), (1, 1))
+    cell, _ = game.search_root(*game.masks(board), 4, None,
+                               ttt.SearchStats(), None)
+    assert (parallel.parallel_minimax(board, workers=2, game=game, depth=4)
+            == divmod(cell, game.n))
+
+
+def test_batch_evaluation_matches_minimax():
+    positions = list(reachable())
+    strings = [batch.encode(key & bitboard.FULL, key >> 9) for key in positions]
+    stats = batch.BatchStats()
+    values, moves = batch.evaluate_batch(strings + positions, stats)
+    assert stats.positions == 2 * len(positions)
+    assert stats.unique < len(positions)
+
+    boards = list(reachable().values()) * 2
+    for board, value, move in zip(boards, values, moves):
+        assert value == ttt.minimax_score(board, 0)
+        if ttt.terminal(board):
+            assert move == -1
+        else:
+            after = ttt.result(board, bitboard.action(move))
+            assert ttt.minimax_score(after, 0) == value
+
+    for bad in ["XXX......", "X.O", "XOXOXOXOZ", 1 | 1 << 9,
+                "XXXOO.O..", "OOOXX.XX."]:
+        with pytest.raises(ValueError):
+            batch.evaluate_batch([bad])
+
+
+def test_self_play_benchmark_never_loses():
+    result = benchmark.run("minimax", games=20, seed=1, cold=True)
+    assert result["ai_losses"] == 0
+    assert result["outcomes"]["ai"] == {"draw": 20}
+    assert sum(result["latency_us"]["histogram"].values()) == result["ai_moves"]
+    assert result["nodes"] > 0
+    assert result["driver_calls"]["tictactoe.result"] > 0
+    # Every node but the roots was reached by a move inside the search
+    search = result["search"]
+    assert search["winner_checks"] <= result["nodes"]
+    assert search["results"] >= result["nodes"] - result["ai_moves"]
+
+    stats = ttt.SearchStats()
+    ttt.alphabeta(ttt.initial_state(), stats)
+    assert stats.results == stats.nodes - 1
+    assert stats.winner_checks == stats.nodes
+    assert ttt.result.__module__ == "tictactoe"
+
+
+def test_opening_book_plays_optimal_moves(tmp_path):
+    filename = tmp_path / "book.bin"
+    book.write_book(book.solve(), filename)
+    assert ttt.load_book(filename)
+    try:
+        for board in reachable().values():
+            if ttt.terminal(board):
+                continue
+            action = ttt.minimax(board)
+            assert (ttt.minimax_score(ttt.result(board, action), 0)
+                    == ttt.minimax_score(board, 0))
+    finally:
+        ttt.opening_book = None
+
+
+def test_corrupt_opening_book_falls_back_to_search(tmp_path):
+    filename = tmp_path / "book.bin"
+    book.write_book(book.solve(), filename)
+    data = bytearray(filename.read_bytes())
+    data[-1] ^= 1
+    filename.write_bytes(bytes(data))
+    assert not ttt.load_book(filename)
+    assert not ttt.load_book(tmp_path / "missing.bin")
+    assert ttt.opening_book is None
+
+
+def test_ai_worker_reuses_its_process():
+    ai = worker.AIWorker()
+    try:
+        pids = []
+        for board in boards:
+            ai.start(board)
+            while not ai.done():
+                time.sleep(0.01)
+            pids.append(ai.process.pid)
+            assert (ttt.minimax_score(ttt.result(board, ai.take()), 0)
+                    == ttt.minimax_score(board, 0))
+        assert len(set(pids)) == 1
+
+        # Cancelling a search in progress replaces the process
+        game = mnk.MNKGame(5, 5, 4)
+        ai.close()
+        ai.search = game.minimax
+        ai.start(game.initial_state())
+        pid = ai.process.pid
+        ai.cancel()
+        assert not ai.busy and ai.process is None
+        ai.start(game.initial_state())
+        assert ai.process.pid != pid
+    finally:
+        ai.close()
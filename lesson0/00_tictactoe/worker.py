@@ -0,0 +1,166 @@
+"""
+Background AI moves
+
+Runs the AI's search in a separate process so the pygame loop keeps
+drawing while it thinks, and can abandon the search when a game is reset.
+The process is kept between moves, so it starts once and whatever the
+search caches (the transposition table and opening book) carries over.
+"""
+
+import multiprocessing
+import time
+
+import tictactoe as ttt
+
+# Whether play has tried to load the opening book in this process
+book_loaded = False
+
+
+def play(board):
+    """
+    Returns the AI's move, from the opening book if one has been built.
+    """
+    global book_loaded
+    if not book_loaded:
+        ttt.load_book()
+        book_loaded = True
+    return ttt.minimax(board)
+
+
+def serve(search, connection):
+    """
+    Sends back the search's move for every board received on the
+    connection, until it receives None or the other end closes.
+    """
+    while True:
+        try:
+            board = connection.recv()
+        except EOFError:
+            break
+        if board is None:
+            break
+        connection.send(search(board))
+    connection.close()
+
+
+class AIWorker():
+    """
+    Computes one move at a time in a child process.
+
+    `search` takes a board and returns an action, and must be picklable
+    (a module-level function or a method of a picklable object, such as
+    an mnk.MNKGame).
+    """
+
+    def __init__(self, search=play):
+        self.search = search
+        # Spawned rather than forked, so the child never inherits the
+        # parent's pygame window
+        self.context = multiprocessing.get_context("spawn")
+        self.process = None
+        self.connection = None
+        self.started = None
+        self.move = None
+        self.finished = False
+
+    @property
+    def busy(self):
+        """
+        True from start until the move is taken or the search cancelled.
+        """
+        return self.started is not None
+
+    @property
+    def elapsed(self):
+        """
+        Seconds since the current search started.
+        """
+        return 0 if self.started is None else time.monotonic() - self.started
+
+    def start(self, board):
+        """
+        Starts searching for a move on the board, cancelling any search
+        already running. Starts the child process if there is none.
+        """
+        self.cancel()
+        if self.process is None:
+            self.connection, child = self.context.Pipe()
+            self.process = self.context.Process(
+                target=serve, args=(self.search, child), daemon=True)
+            self.process.start()
+            child.close()
+        self.connection.send(board)
+        self.started = time.monotonic()
+        self.move = None
+        self.finished = False
+
+    def done(self):
+        """
+        Returns True once the move is ready, without blocking.
+        """
+        if self.started is None:
+            return False
+        if not self.finished and self.connection.poll():
+            try:
+                self.move = self.connection.recv()
+            except EOFError:
+                self.stop()
+                raise Exception("AI search process died") from None
+            self.finished = True
+        return self.finished
+
+    def take(self):
+        """
+        Returns the finished move and readies the worker for the next one.
+        """
+        if not self.done():
+            raise Exception("AI move is not ready")
+        move = self.move
+        self.cancel()
+        return move
+
+    def cancel(self):
+        """
+        Discards the current search's result, if any. A search still
+        running is stopped by ending the child process, which is started
+        again for the next move.
+        """
+        if self.started is not None and not self.finished:
+            finished = False
+            try:
+                if self.connection.poll():
+                    # Read a move already sent back, so it cannot answer
+                    # the next board instead
+                    self.connection.recv()
+                    finished = True
+            except EOFError:
+                pass
+            if not finished:
+                self.stop()
+        self.started = None
+        self.move = None
+        self.finished = False
+
+    def stop(self):
+        """
+        Ends the child process at once.
+        """
+        if self.process is not None:
+            if self.process.is_alive():
+                self.process.terminate()
+            self.process.join()
+            self.connection.close()
+        self.process = None
+        self.connection = None
+
+    def close(self):
+        """
+        Cancels any search and lets the child process exit.
+        """
+        self.cancel()
+        if self.process is not None:
+            self.connection.send(None)
+            self.process.join()
+            self.connection.close()
+        self.process = None
+        self.connection = None
@@ -15,6 +15,19 @@ class Sentence():
         """Returns a set of all symbols in the logical sentence."""
         return set()
 
+    def emit(self, index, code):
+        """Returns a Python expression evaluating the sentence in a model
+        tuple `m`, where index maps each symbol to its position in `m`.
+        Long subexpressions are computed by statements appended to the
+        list `code` first, and referred to by name."""
+        raise Exception("nothing to compile")
+
+    def bits(self, columns, mask):
+        """Returns an int whose bit j is the sentence's value in model j,
+        given each symbol's column of values and mask with every model's
+        bit set."""
+        raise Exception("nothing to evaluate")
+
     @classmethod
     def validate(cls, sentence):
         if not isinstance(sentence, Sentence):
@@ -68,6 +81,12 @@ class Symbol(Sentence):
     def symbols(self):
         return {self.name}
 
+    def emit(self, index, code):
+        return f"m[{index[self.name]}]"
+
+    def bits(self, columns, mask):
+        return columns[self.name]
+
 
 class Not(Sentence):
     def __init__(self, operand):
@@ -92,6 +111,12 @@ class Not(Sentence):
     def symbols(self):
         return self.operand.symbols()
 
+    def emit(self, index, code):
+        return assign(code, f"(not {self.operand.emit(index, code)})")
+
+    def bits(self, columns, mask):
+        return mask ^ self.operand.bits(columns, mask)
+
 
 class And(Sentence):
     def __init__(self, *conjuncts):
@@ -129,6 +154,18 @@ class And(Sentence):
     def symbols(self):
         return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
 
+    def emit(self, index, code):
+        if not self.conjuncts:
+            return "True"
+        operands = [conjunct.emit(index, code) for conjunct in self.conjuncts]
+        return assign(code, "(" + " and ".join(operands) + ")")
+
+    def bits(self, columns, mask):
+        result = mask
+        for conjunct in self.conjuncts:
+            result &= conjunct.bits(columns, mask)
+        return result
+
 
 class Or(Sentence):
     def __init__(self, *disjuncts):
@@ -160,6 +197,18 @@ class Or(Sentence):
     def symbols(self):
         return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
 
+    def emit(self, index, code):
+        if not self.disjuncts:
+            return "False"
+        operands = [disjunct.emit(index, code) for disjunct in self.disjuncts]
+        return assign(code, "(" + " or ".join(operands) + ")")
+
+    def bits(self, columns, mask):
+        result = 0
+        for disjunct in self.disjuncts:
+            result |= disjunct.bits(columns, mask)
+        return result
+
 
 class Implication(Sentence):
     def __init__(self, antecedent, consequent):
@@ -191,6 +240,15 @@ class Implication(Sentence):
     def symbols(self):
         return set.union(self.antecedent.symbols(), self.consequent.symbols())
 
+    def emit(self, index, code):
+        antecedent = self.antecedent.emit(index, code)
+        consequent = self.consequent.emit(index, code)
+        return assign(code, f"(not {antecedent} or {consequent})")
+
+    def bits(self, columns, mask):
+        return ((mask ^ self.antecedent.bits(columns, mask))
+                | self.consequent.bits(columns, mask))
+
 
 class Biconditional(Sentence):
     def __init__(self, left, right):
@@ -224,40 +282,97 @@ class Biconditional(Sentence):
     def symbols(self):
         return set.union(self.left.symbols(), self.right.symbols())
 
+    def emit(self, index, code):
+        # Every operand is a bool, so == is <=> and each side is
+        # evaluated once
+        left = self.left.emit(index, code)
+        right = self.right.emit(index, code)
+        return assign(code, f"({left} == {right})")
+
+    def bits(self, columns, mask):
+        return mask ^ (self.left.bits(columns, mask)
+                       ^ self.right.bits(columns, mask))
+
+
+# Longest expression compile_sentence leaves inline. Every level of
+# nesting adds a pair of parentheses, so this keeps well under the
+# parser's limit of 200 nested parentheses
+INLINE_LIMIT = 200
+
+
+def assign(code, expression):
+    """Returns the expression, or once it is long enough that it might
+    nest too deep for Python's parser, the name of a new variable that a
+    statement appended to `code` assigns it to."""
+    if len(expression) <= INLINE_LIMIT:
+        return expression
+    name = f"t{len(code)}"
+    code.append(f"{name} = {expression}")
+    return name
+
+
+def compile_sentence(sentence, index):
+    """Returns a function of a model tuple that evaluates the sentence,
+    where index maps each symbol to its position in the tuple.
+
+    Deeply nested sentences are split into a sequence of statements, so
+    they stay within the limits of Python's parser. Like the other
+    methods of sentences, emit recurses once per level of nesting, so
+    sentences must nest less deeply than the recursion limit (1000 by
+    default)."""
+    code = []
+    result = sentence.emit(index, code)
+    source = "def evaluate(m):\n" + "".join(
+        f"    {line}\n" for line in code) + f"    return {result}\n"
+    namespace = {}
+    exec(source, namespace)
+    return namespace["evaluate"]
+
 
 def model_check(knowledge, query):
     """Checks if knowledge base entails query."""
 
-    def check_all(knowledge, query, symbols, model):
-        """Checks if knowledge base entails query, given a particular model."""
-
-        # If model has an assignment for each symbol
-        if not symbols:
-
-            # If knowledge base is true in model, then query must also be true
-            if knowledge.evaluate(model):
-                return query.evaluate(model)
-            return True
-        else:
-
-            # Choose one of the remaining unused symbols
-            remaining = symbols.copy()
-            p = remaining.pop()
-
-            # Create a model where the symbol is true
-            model_true = model.copy()
-            model_true[p] = True
-
-            # Create a model where the symbol is false
-            model_false = model.copy()
-            model_false[p] = False
-
-            # Ensure entailment holds in both models
-            return (check_all(knowledge, query, remaining, model_true) and
-                    check_all(knowledge, query, remaining, model_false))
-
-    # Get all symbols in both knowledge and query
-    symbols = set.union(knowledge.symbols(), query.symbols())
-
-    # Check that knowledge entails query
-    return check_all(knowledge, query, symbols, dict())
+    # Get all symbols in both knowledge and query, each with a position
+    # in the model tuples
+    symbols = sorted(set.union(knowledge.symbols(), query.symbols()))
+    index = {symbol: i for i, symbol in enumerate(symbols)}
+
+    # In every model where knowledge base is true, query must also be true
+    check = compile_sentence(Implication(knowledge, query), index)
+    models = itertools.product((True, False), repeat=len(symbols))
+    return all(map(check, models))
+
+
+def truth_table_columns(width):
+    """Returns a list of `width` ints where bit j of the i-th int is bit i
+    of j, so together they enumerate all 2^width models."""
+    size = 1 << width
+    columns = []
+    for i in range(width):
+        # 2^i zeros then 2^i ones, doubled until it covers every model
+        pattern = ((1 << (1 << i)) - 1) << (1 << i)
+        length = 2 << i
+        while length < size:
+            pattern |= pattern << length
+            length *= 2
+        columns.append(pattern)
+    return columns
+
+
+def bitwise_model_check(knowledge, query, width=20):
+    """Checks if knowledge base entails query, evaluating the sentences
+    on 2^width models at once as bitwise operations over Python ints."""
+    symbols = sorted(set.union(knowledge.symbols(), query.symbols()))
+    width = min(width, len(symbols))
+    inner, outer = symbols[:width], symbols[width:]
+    mask = (1 << (1 << width)) - 1
+    columns = dict(zip(inner, truth_table_columns(width)))
+    sentence = Implication(knowledge, query)
+
+    # Symbols beyond the width are the same in every model of a batch,
+    # so their columns are all ones or all zeros
+    for values in itertools.product((mask, 0), repeat=len(outer)):
+        columns.update(zip(outer, values))
+        if sentence.bits(columns, mask) != mask:
+            return False
+    return True
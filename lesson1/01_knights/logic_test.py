@@ -0,0 +1,139 @@
+import random
+
+import pytest
+
+import puzzle
+from logic import (And, Biconditional, Implication, Not, Or, Sentence,
+                   Symbol, bitwise_model_check, compile_sentence,
+                   model_check)
+from sat import CNF, Solver, entails, satisfiable
+
+symbols = [Symbol(name) for name in "PQRSTU"]
+
+
+def random_sentence(rng, depth):
+    """
+    Returns a random sentence over `symbols` nested up to `depth` deep.
+    """
+    if depth == 0 or rng.random() < 0.2:
+        return rng.choice(symbols)
+    kind = rng.choice([Not, And, Or, Implication, Biconditional])
+    if kind is Not:
+        return Not(random_sentence(rng, depth - 1))
+    if kind in (And, Or):
+        return kind(*[random_sentence(rng, depth - 1)
+                      for _ in range(rng.randint(1, 3))])
+    return kind(random_sentence(rng, depth - 1),
+                random_sentence(rng, depth - 1))
+
+
+def test_entails_agrees_with_model_check():
+    rng = random.Random(0)
+    for _ in range(300):
+        knowledge = And(*[random_sentence(rng, 3) for _ in range(3)])
+        query = random_sentence(rng, 3)
+        assert entails(knowledge, query) == model_check(knowledge, query)
+
+
+def test_compiled_sentences_match_evaluate():
+    rng = random.Random(2)
+    names = [symbol.name for symbol in symbols]
+    index = {name: i for i, name in enumerate(names)}
+    for _ in range(200):
+        sentence = random_sentence(rng, 4)
+        function = compile_sentence(sentence, index)
+        for _ in range(8):
+            m = tuple(rng.random() < 0.5 for _ in names)
+            assert function(m) == sentence.evaluate(dict(zip(names, m)))
+    assert compile_sentence(And(), index)(()) is True
+    assert compile_sentence(Or(), index)(()) is False
+
+
+@pytest.mark.parametrize("depth", [300, 800])
+def test_deeply_nested_sentences_compile(depth):
+    # Past the parser's 200 nested parentheses, within the recursion limit
+    sentence = symbols[0]
+    for _ in range(depth):
+        sentence = Not(sentence)
+    assert model_check(And(symbols[0]), sentence)
+    assert not model_check(And(symbols[0]), Not(sentence))
+
+
+def test_bitwise_model_check_agrees_with_model_check():
+    rng = random.Random(3)
+    for _ in range(300):
+        knowledge = And(*[random_sentence(rng, 3) for _ in range(3)])
+        query = random_sentence(rng, 3)
+        expected = model_check(knowledge, query)
+        assert bitwise_model_check(knowledge, query) == expected
+        # Batches smaller than the number of symbols
+        assert bitwise_model_check(knowledge, query, width=2) == expected
+
+
+def test_satisfiable_returns_a_model():
+    rng = random.Random(1)
+    for _ in range(200):
+        sentence = random_sentence(rng, 4)
+        model = satisfiable(sentence)
+        if model is None:
+            # Unsatisfiable sentences entail a contradiction
+            assert model_check(sentence, And(symbols[0], Not(symbols[0])))
+        else:
+            for name in sentence.symbols() - set(model):
+                model[name] = False
+            assert sentence.evaluate(model)
+
+
+def test_puzzle_answers():
+    expected = {
+        "knowledge0": ["A is a Knave"],
+        "knowledge1": ["A is a Knave", "B is a Knight"],
+        "knowledge2": ["A is a Knave", "B is a Knight"],
+        "knowledge3": ["A is a Knight", "B is a Knave", "C is a Knight"],
+    }
+    people = [puzzle.AKnight, puzzle.AKnave, puzzle.BKnight,
+              puzzle.BKnave, puzzle.CKnight, puzzle.CKnave]
+    for name, answer in expected.items():
+        knowledge = getattr(puzzle, name)
+        assert [s.name for s in people if entails(knowledge, s)] == answer
+
+
+def test_pigeonhole_needs_clause_learning():
+    # Six pigeons cannot each have one of five holes to themselves
+    pigeons, holes = 6, 5
+    cnf = CNF()
+    p = [[cnf.new_var() for _ in range(holes)] for _ in range(pigeons)]
+    for i in range(pigeons):
+        cnf.clauses.append(p[i][:])
+    for h in range(holes):
+        for i in range(pigeons):
+            for j in range(i + 1, pigeons):
+                cnf.clauses.append([-p[i][h], -p[j][h]])
+    solver = Solver(cnf.num_vars, cnf.clauses)
+    assert not solver.solve()
+    assert solver.conflicts > 0
+
+
+def test_long_chain_needs_no_search():
+    chain = [Symbol(f"X{i}") for i in range(500)]
+    knowledge = And(chain[0], *[Implication(a, b)
+                                for a, b in zip(chain, chain[1:])])
+    assert entails(knowledge, chain[-1])
+    assert not entails(knowledge, Not(chain[-1]))
+
+    # Unit propagation alone settles both queries, in linear time
+    for query, expected in [(Not(chain[-1]), False), (chain[-1], True)]:
+        cnf = CNF()
+        cnf.add(knowledge)
+        cnf.add(query)
+        solver = Solver(cnf.num_vars, cnf.clauses)
+        assert solver.solve() == expected
+        assert solver.decisions == 0 and solver.conflicts == 0
+
+
+def test_unknown_sentence_type():
+    class Custom(Sentence):
+        pass
+
+    with pytest.raises(TypeError):
+        entails(Custom(), symbols[0])
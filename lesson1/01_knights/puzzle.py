@@ -1,4 +1,5 @@
 from logic import *
+from sat import entails
 
 AKnight = Symbol("A is a Knight")
 AKnave = Symbol("A is a Knave")
@@ -104,7 +105,7 @@ def main():
             print("    Not yet implemented.")
         else:
             for symbol in symbols:
-                if model_check(knowledge, symbol):
+                if entails(knowledge, symbol):
                     print(f"    {symbol}")
 
 
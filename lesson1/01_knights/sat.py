@@ -0,0 +1,354 @@
+"""
+Entailment by satisfiability
+
+Compiles logic.py sentences to conjunctive normal form with the Tseitin
+transformation, which adds one variable per connective instead of
+multiplying clauses out, and decides them with a CDCL solver: DPLL
+search with unit propagation over two watched literals, learning a
+clause from every conflict at its first unique implication point.
+
+A knowledge base entails a query exactly when the knowledge base
+together with the negated query has no model.
+"""
+
+import heapq
+
+from logic import And, Biconditional, Implication, Not, Or, Symbol
+
+
+class CNF():
+    """
+    Clauses over integer variables 1..num_vars, where a literal is v for
+    "v is true" and -v for "v is false".
+    """
+
+    def __init__(self):
+        self.num_vars = 0
+        self.clauses = []
+        # Symbol name -> variable
+        self.variables = {}
+        # Sentence -> literal equivalent to it
+        self.literals = {}
+        self.true = None
+
+    def new_var(self):
+        self.num_vars += 1
+        return self.num_vars
+
+    def add(self, sentence):
+        """
+        Adds clauses that hold exactly when the sentence is true.
+        """
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                self.add(conjunct)
+        elif isinstance(sentence, Or):
+            self.clauses.append([self.literal(disjunct)
+                                 for disjunct in sentence.disjuncts])
+        elif isinstance(sentence, Implication):
+            self.clauses.append([-self.literal(sentence.antecedent),
+                                 self.literal(sentence.consequent)])
+        else:
+            self.clauses.append([self.literal(sentence)])
+
+    def literal(self, sentence):
+        """
+        Returns a literal that is true exactly when the sentence is,
+        adding a variable and its defining clauses for each connective.
+        """
+        if isinstance(sentence, Symbol):
+            if sentence.name not in self.variables:
+                self.variables[sentence.name] = self.new_var()
+            return self.variables[sentence.name]
+        if isinstance(sentence, Not):
+            return -self.literal(sentence.operand)
+        if sentence in self.literals:
+            return self.literals[sentence]
+
+        if isinstance(sentence, And):
+            literal = self.define_and(
+                [self.literal(c) for c in sentence.conjuncts])
+        elif isinstance(sentence, Or):
+            literal = -self.define_and(
+                [-self.literal(d) for d in sentence.disjuncts])
+        elif isinstance(sentence, Implication):
+            literal = -self.define_and([self.literal(sentence.antecedent),
+                                        -self.literal(sentence.consequent)])
+        elif isinstance(sentence, Biconditional):
+            a = self.literal(sentence.left)
+            b = self.literal(sentence.right)
+            literal = self.new_var()
+            self.clauses.extend([[-literal, -a, b], [-literal, a, -b],
+                                 [literal, a, b], [literal, -a, -b]])
+        else:
+            raise TypeError(f"cannot compile {type(sentence).__name__}")
+        self.literals[sentence] = literal
+        return literal
+
+    def define_and(self, literals):
+        """
+        Returns a literal equivalent to the conjunction of literals.
+        """
+        if not literals:
+            if self.true is None:
+                self.true = self.new_var()
+                self.clauses.append([self.true])
+            return self.true
+        if len(literals) == 1:
+            return literals[0]
+        v = self.new_var()
+        for literal in literals:
+            self.clauses.append([-v, literal])
+        self.clauses.append([v] + [-literal for literal in literals])
+        return v
+
+
+class Solver():
+    """
+    CDCL satisfiability solver for CNF clauses.
+    """
+
+    def __init__(self, num_vars, clauses=()):
+        self.num_vars = num_vars
+        # value[v] is True, False or None while unassigned
+        self.value = [None] * (num_vars + 1)
+        self.level = [0] * (num_vars + 1)
+        # Clause that forced each variable, None for decisions
+        self.reason = [None] * (num_vars + 1)
+        # Phase each variable last had, tried first when deciding
+        self.phase = [False] * (num_vars + 1)
+        self.activity = [0.0] * (num_vars + 1)
+        self.bump = 1.0
+        self.order = [(0.0, v) for v in range(1, num_vars + 1)]
+
+        self.trail = []
+        # Trail length at the start of each decision level
+        self.trail_lim = []
+        self.head = 0
+        # Literal -> clauses watching it
+        self.watches = {}
+        self.ok = True
+        self.conflicts = 0
+        self.decisions = 0
+        for clause in clauses:
+            self.add_clause(clause)
+
+    def literal_value(self, literal):
+        value = self.value[abs(literal)]
+        if value is None or literal > 0:
+            return value
+        return not value
+
+    def add_clause(self, clause):
+        """
+        Adds a clause before solving. Returns False once the clauses
+        are known to be unsatisfiable.
+        """
+        literals = set(clause)
+        if any(-literal in literals for literal in literals):
+            return self.ok
+        clause = [literal for literal in literals
+                  if self.literal_value(literal) is not False]
+        if any(self.literal_value(literal) for literal in clause):
+            return self.ok
+        if not clause:
+            self.ok = False
+        elif len(clause) == 1:
+            self.assign(clause[0], None)
+            self.ok = self.ok and self.propagate() is None
+        else:
+            self.watch(clause)
+        return self.ok
+
+    def watch(self, clause):
+        self.watches.setdefault(clause[0], []).append(clause)
+        self.watches.setdefault(clause[1], []).append(clause)
+
+    def assign(self, literal, reason):
+        v = abs(literal)
+        self.value[v] = literal > 0
+        self.level[v] = len(self.trail_lim)
+        self.reason[v] = reason
+        self.trail.append(literal)
+
+    def propagate(self):
+        """
+        Assigns every literal forced by a clause with one literal left.
+        Returns a clause whose literals are all false, or None.
+        """
+        while self.head < len(self.trail):
+            false = -self.trail[self.head]
+            self.head += 1
+            watching = self.watches.get(false, [])
+            kept = []
+            conflict = None
+            for i, clause in enumerate(watching):
+                if clause[0] == false:
+                    clause[0], clause[1] = clause[1], clause[0]
+                if self.literal_value(clause[0]) is True:
+                    kept.append(clause)
+                    continue
+
+                # Move the watch to another literal that is not false
+                for j in range(2, len(clause)):
+                    if self.literal_value(clause[j]) is not False:
+                        clause[1], clause[j] = clause[j], clause[1]
+                        self.watches.setdefault(clause[1], []).append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    if self.literal_value(clause[0]) is False:
+                        conflict = clause
+                        kept.extend(watching[i + 1:])
+                        break
+                    self.assign(clause[0], clause)
+            self.watches[false] = kept
+            if conflict is not None:
+                return conflict
+        return None
+
+    def analyze(self, conflict):
+        """
+        Returns (clause, level): the clause learned from a conflict,
+        with its one literal at the current level first, and the level
+        to jump back to.
+        """
+        current = len(self.trail_lim)
+        seen = set()
+        learned = [None]
+        pending = 0
+        literal = None
+        index = len(self.trail) - 1
+        clause = conflict
+        while True:
+            for q in clause:
+                v = abs(q)
+                if literal is not None and v == abs(literal):
+                    continue
+                if v not in seen and self.level[v] > 0:
+                    seen.add(v)
+                    self.bump_activity(v)
+                    if self.level[v] == current:
+                        pending += 1
+                    else:
+                        learned.append(q)
+
+            # The most recent assignment involved in the conflict
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            literal = self.trail[index]
+            index -= 1
+            seen.discard(abs(literal))
+            pending -= 1
+            if pending == 0:
+                break
+            clause = self.reason[abs(literal)]
+        learned[0] = -literal
+
+        if len(learned) == 1:
+            return learned, 0
+        # Watch the literal from the highest remaining level second, so
+        # the clause is still watched correctly after jumping back
+        highest = max(range(1, len(learned)),
+                      key=lambda i: self.level[abs(learned[i])])
+        learned[1], learned[highest] = learned[highest], learned[1]
+        return learned, self.level[abs(learned[1])]
+
+    def bump_activity(self, v):
+        self.activity[v] += self.bump
+        if self.activity[v] > 1e100:
+            self.activity = [a * 1e-100 for a in self.activity]
+            self.bump *= 1e-100
+            self.order = [(-self.activity[u], u)
+                          for u in range(1, self.num_vars + 1)]
+            heapq.heapify(self.order)
+        else:
+            heapq.heappush(self.order, (-self.activity[v], v))
+
+    def backtrack(self, level):
+        if len(self.trail_lim) <= level:
+            return
+        start = self.trail_lim[level]
+        for literal in self.trail[start:]:
+            v = abs(literal)
+            self.phase[v] = self.value[v]
+            self.value[v] = None
+            self.reason[v] = None
+            heapq.heappush(self.order, (-self.activity[v], v))
+        del self.trail[start:]
+        del self.trail_lim[level:]
+        self.head = start
+
+    def decide(self):
+        """
+        Returns the unassigned variable with the most activity, or None
+        if every variable is assigned.
+        """
+        while self.order:
+            _, v = heapq.heappop(self.order)
+            if self.value[v] is None:
+                return v
+        return None
+
+    def solve(self):
+        """
+        Returns True if the clauses are satisfiable, leaving a model in
+        self.value, and False otherwise.
+        """
+        if not self.ok:
+            return False
+        restart = 100
+        since_restart = 0
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                self.conflicts += 1
+                since_restart += 1
+                if not self.trail_lim:
+                    self.ok = False
+                    return False
+                learned, level = self.analyze(conflict)
+                self.backtrack(level)
+                if len(learned) == 1:
+                    self.assign(learned[0], None)
+                else:
+                    self.watch(learned)
+                    self.assign(learned[0], learned)
+                self.bump /= 0.95
+                continue
+
+            if since_restart >= restart:
+                since_restart = 0
+                restart = int(restart * 1.5)
+                self.backtrack(0)
+                continue
+
+            v = self.decide()
+            if v is None:
+                return True
+            self.decisions += 1
+            self.trail_lim.append(len(self.trail))
+            self.assign(v if self.phase[v] else -v, None)
+
+
+def satisfiable(sentence):
+    """
+    Returns a model of the sentence as a dict from symbol name to bool,
+    or None if it has no model.
+    """
+    cnf = CNF()
+    cnf.add(sentence)
+    solver = Solver(cnf.num_vars, cnf.clauses)
+    if not solver.solve():
+        return None
+    return {name: bool(solver.value[v]) for name, v in cnf.variables.items()}
+
+
+def entails(knowledge, query):
+    """
+    Checks if knowledge base entails query.
+    """
+    cnf = CNF()
+    cnf.add(knowledge)
+    cnf.add(Not(query))
+    return not Solver(cnf.num_vars, cnf.clauses).solve()